@@ -6,36 +6,51 @@ Systematic debugging script for MCP server import issues
 import sys
 import time
 import logging
+import logging.handlers
 from typing import Callable
 
-# Set up detailed logging
+# Set up detailed logging: INFO to stdout, DEBUG to the log file. File writes
+# are buffered so the timed imports don't pay for a flush on every record.
+_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setLevel(logging.INFO)
+_stdout_handler.setFormatter(_formatter)
+
+_log_file = logging.FileHandler('debug_imports.log')
+_log_file.setFormatter(_formatter)
+_file_handler = logging.handlers.MemoryHandler(capacity=1024, target=_log_file)
+_file_handler.setLevel(logging.DEBUG)
+
 logging.basicConfig(
     level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('debug_imports.log')
-    ]
+    handlers=[_stdout_handler, _file_handler]
 )
 
 logger = logging.getLogger(__name__)
 
 def time_import(import_func: Callable, name: str):
     """Time an import operation and catch any exceptions"""
+    # A module that is already loaded would only measure a sys.modules lookup,
+    # so report it as cached rather than as a (misleadingly fast) import
+    if name in sys.modules:
+        logger.info("%s already imported (cached)", name)
+        return sys.modules[name], 0.0
+
     start_time = time.time()
-    logger.info(f"Starting import: {name}")
+    logger.info("Starting import: %s", name)
 
     try:
         result = import_func()
         end_time = time.time()
         duration = end_time - start_time
-        logger.info(".2f")
+        logger.info("%s took %.2fs", name, duration)
         return result, duration
     except Exception as e:
         end_time = time.time()
         duration = end_time - start_time
-        logger.error(".2f")
-        logger.error(f"Exception: {e}")
+        logger.error("%s failed after %.2fs", name, duration)
+        logger.error("Exception: %s", e)
         import traceback
         logger.error("Traceback:")
         logger.error(traceback.format_exc())
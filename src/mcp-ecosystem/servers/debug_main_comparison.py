@@ -3,10 +3,11 @@
 Compare minimal server vs main server to find the breaking point
 """
 
+import json
 import sys
 import time
 import logging
-import threading
+import signal
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,40 +20,41 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Health check body is constant, so serialize it once instead of per request
+_HEALTH_BODY = json.dumps({"status": "healthy", "server": "mem0-mcp-minimal"}).encode()
+
+def _alarm_handler(signum, frame):
+    raise TimeoutError
+
+signal.signal(signal.SIGALRM, _alarm_handler)
+
 def time_operation(operation_func, name: str, timeout: int = 10):
     """Time an operation with a timeout"""
-    result = [None]
-    exception = [None]
-
-    def run_operation():
-        try:
-            result[0] = operation_func()
-        except Exception as e:
-            exception[0] = e
-            logger.error(f"Exception in {name}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-
     start_time = time.time()
     logger.info(f"Starting operation: {name}")
 
-    thread = threading.Thread(target=run_operation)
-    thread.daemon = True
-    thread.start()
-    thread.join(timeout)
-
-    end_time = time.time()
-    duration = end_time - start_time
-
-    if thread.is_alive():
-        logger.error(".2f")
+    # SIGALRM interrupts the operation in the main thread, so a timed-out
+    # operation can't keep running in the background and skew later results
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        result = operation_func()
+    except TimeoutError:
+        duration = time.time() - start_time
+        logger.error(f"{name} timed out after {duration:.2f}s")
         return None, duration
-    elif exception[0]:
-        logger.error(".2f")
+    except Exception as e:
+        duration = time.time() - start_time
+        logger.error(f"Exception in {name}: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        logger.error(f"{name} failed after {duration:.2f}s")
         return None, duration
-    else:
-        logger.info(".2f")
-        return result[0], duration
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    duration = time.time() - start_time
+    logger.info(f"{name} completed in {duration:.2f}s")
+    return result, duration
 
 def test_minimal_server():
     """Test the minimal server that works"""
@@ -61,7 +63,7 @@ def test_minimal_server():
     def create_minimal():
         from starlette.applications import Starlette
         from starlette.routing import Route
-        from starlette.responses import JSONResponse
+        from starlette.responses import Response
         from mcp.server.fastmcp import FastMCP
 
         mcp = FastMCP("mem0-mcp-minimal")
@@ -71,7 +73,7 @@ def test_minimal_server():
             return "MCP server is running"
 
         async def health_endpoint(request):
-            return JSONResponse({"status": "healthy", "server": "mem0-mcp-minimal"})
+            return Response(_HEALTH_BODY, media_type="application/json")
 
         async def handle_sse(request):
             from mcp.server.sse import SseServerTransport
@@ -3,83 +3,198 @@
 Debug server startup process specifically
 """
 
+import asyncio
+import os
 import sys
 import time
+import types
 import logging
-import threading
 from typing import Callable
 
-# Set up detailed logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('debug_server_startup.log')
-    ]
-)
+# Modules only the diagnostics need (inspect, threading, ...) are
+# imported inside the functions that use them, keeping module import cheap
+
+# Detailed (DEBUG) logging is opt-in via DEBUG_STARTUP
+DEBUG_STARTUP = bool(os.environ.get("DEBUG_STARTUP"))
 
 logger = logging.getLogger(__name__)
 
-def time_operation(operation_func: Callable, name: str, timeout: int = 10):
-    """Time an operation with a timeout"""
-    result = [None]
-    exception = [None]
+def _setup_logging():
+    """Install the stdout and log-file handlers; called from main, not at import"""
+    import atexit
+    import queue
+    import logging.handlers
+
+    # File writes happen on a listener thread so disk I/O stays off the timed
+    # path, and are batched so each record doesn't cost its own write + flush.
+    # The file is only opened once the first batch is written
+    log_file = logging.FileHandler('debug_server_startup.log', delay=True)
+    log_buffer = logging.handlers.MemoryHandler(capacity=64, flushLevel=logging.ERROR, target=log_file)
+    atexit.register(log_buffer.flush)
+
+    log_queue = queue.SimpleQueue()
+    log_listener = logging.handlers.QueueListener(log_queue, log_buffer)
+    log_listener.start()
+    # Registered after the flush so atexit stops the listener (draining the queue) first
+    atexit.register(log_listener.stop)
+
+    logging.basicConfig(
+        level=logging.DEBUG if DEBUG_STARTUP else logging.INFO,
+        format='%(relativeCreated)d - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            logging.handlers.QueueHandler(log_queue)
+        ]
+    )
+
+class _LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __getattr__(self, attr):
+        import importlib
+
+        value = getattr(importlib.import_module(self.__name__), attr)
+        setattr(self, attr, value)
+        return value
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return a proxy for module `name` that defers the import until it is used"""
+    return _LazyModule(name)
+
+# Heavy third-party modules are resolved once, on first use, and shared by
+# every test below
+starlette_applications = lazy_import("starlette.applications")
+starlette_routing = lazy_import("starlette.routing")
+starlette_responses = lazy_import("starlette.responses")
+mcp_fastmcp = lazy_import("mcp.server.fastmcp")
+mcp_sse = lazy_import("mcp.server.sse")
+uvicorn = lazy_import("uvicorn")
+
+_static_router = None
+
+def static_router_class():
+    """Build (once) a Starlette Router that serves exact static paths via a dict lookup"""
+    global _static_router
+    if _static_router is not None:
+        return _static_router
+
+    Router = starlette_routing.Router
+    Route = starlette_routing.Route
+
+    class StaticRouter(Router):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            paths = [route.path for route in self.routes if isinstance(route, Route)]
+            # Only parameterless paths that a single route owns can bypass matching
+            self._static_map = {
+                route.path: route for route in self.routes
+                if isinstance(route, Route) and not route.param_convertors and paths.count(route.path) == 1
+            }
+
+        async def app(self, scope, receive, send):
+            if scope["type"] == "http" and not scope.get("root_path"):
+                route = self._static_map.get(scope["path"])
+                if route is not None:
+                    scope.setdefault("router", self)
+                    scope["endpoint"] = route.endpoint
+                    scope["path_params"] = {}
+                    # Route.handle answers 405 itself on a method mismatch
+                    await route.handle(scope, receive, send)
+                    return
+            await super().app(scope, receive, send)
+
+    _static_router = StaticRouter
+    return StaticRouter
+
+def _run_in_daemon_thread(func: Callable) -> asyncio.Future:
+    """Run a blocking callable on its own daemon thread, resolving a loop future.
+
+    A hung operation is never joined: it neither keeps the process alive at
+    exit nor holds up the operations timed after it.
+    """
+    import threading
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(setter, value):
+        # The waiter may already have given up (timeout cancels the future)
+        if not future.done():
+            setter(value)
 
     def run_operation():
         try:
-            result[0] = operation_func()
-        except Exception as e:
-            exception[0] = e
-            import traceback
-            logger.error(f"Exception in {name}: {e}")
-            logger.error(traceback.format_exc())
-
-    start_time = time.time()
-    logger.info(f"Starting operation: {name}")
-
-    thread = threading.Thread(target=run_operation)
-    thread.daemon = True
-    thread.start()
-    thread.join(timeout)
-
-    end_time = time.time()
-    duration = end_time - start_time
-
-    if thread.is_alive():
-        logger.error(".2f")
+            outcome = (future.set_result, func())
+        except BaseException as e:
+            outcome = (future.set_exception, e)
+        try:
+            loop.call_soon_threadsafe(resolve, *outcome)
+        except RuntimeError:
+            # The loop has closed; nobody is waiting for this result any more
+            pass
+
+    threading.Thread(target=run_operation, name="time_op", daemon=True).start()
+    return future
+
+async def time_operation(operation_func: Callable, name: str, timeout: int = 10):
+    """Time an operation with a timeout; sync callables run on a daemon thread"""
+    import inspect
+
+    start_time = time.perf_counter()
+    logger.info("Starting operation: %s", name)
+
+    try:
+        async with asyncio.timeout(timeout):
+            if inspect.iscoroutinefunction(operation_func):
+                result = await operation_func()
+            else:
+                result = await _run_in_daemon_thread(operation_func)
+    except TimeoutError:
+        duration = time.perf_counter() - start_time
+        logger.error("%s timed out after %.2fs", name, duration)
         return None, duration
-    elif exception[0]:
-        logger.error(".2f")
+    except Exception as e:
+        duration = time.perf_counter() - start_time
+        logger.exception("Exception in %s: %s", name, e)
+        logger.error("%s raised %r after %.2fs", name, e, duration)
         return None, duration
-    else:
-        logger.info(".2f")
-        return result[0], duration
+    except SystemExit as e:
+        # uvicorn exits instead of raising when it cannot bind its socket
+        duration = time.perf_counter() - start_time
+        logger.error("%s exited with status %s after %.2fs", name, e.code, duration)
+        return None, duration
+
+    duration = time.perf_counter() - start_time
+    logger.info("%s completed in %.2fs", name, duration)
+    return result, duration
 
-def test_minimal_server_creation():
+async def test_minimal_server_creation():
     """Test creating the minimal server without starting it"""
     logger.info("=== TESTING MINIMAL SERVER CREATION ===")
 
     def create_minimal_server():
-        from starlette.applications import Starlette
-        from starlette.routing import Route
-        from starlette.responses import JSONResponse
-        from mcp.server.fastmcp import FastMCP
+        Starlette = starlette_applications.Starlette
+        Route = starlette_routing.Route
+        Mount = starlette_routing.Mount
+        JSONResponse = starlette_responses.JSONResponse
 
-        # Create MCP server
-        mcp = FastMCP("mem0-mcp-minimal")
+        # Import and build the MCP server here, inside the timed step, so a
+        # hanging mcp import is caught by the timeout instead of blocking the
+        # event loop
+        mcp = mcp_fastmcp.FastMCP("mem0-mcp-minimal")
 
         @mcp.tool()
         async def health_check() -> str:
             return "MCP server is running"
 
+        # One transport serves every connection
+        sse = mcp_sse.SseServerTransport("/messages/")
+
         # Create Starlette app
         async def health_endpoint(request):
             return JSONResponse({"status": "healthy", "server": "mem0-mcp-minimal"})
 
         async def handle_sse(request):
-            from mcp.server.sse import SseServerTransport
-            sse = SseServerTransport("/messages/")
             async with sse.connect_sse(
                 request.scope, request.receive, request._send
             ) as (read_stream, write_stream):
@@ -89,53 +204,86 @@ def test_minimal_server_creation():
                 )
 
         async def handle_post_message(request):
-            from mcp.server.sse import SseServerTransport
-            sse = SseServerTransport("/messages/")
             return await sse.handle_post_message(request)
 
-        app = Starlette(routes=[
+        # All routes are static, so dispatch them by exact path instead of
+        # regex-matching each one in turn. The static router is mounted through
+        # the constructor, which keeps owning the middleware setup
+        static_routes = static_router_class()(routes=[
             Route("/mcp/default_client/sse/default_user", endpoint=handle_sse, methods=["GET"]),
             Route("/messages/", endpoint=handle_post_message, methods=["POST"]),
             Route("/health", endpoint=health_endpoint, methods=["GET"]),
         ])
+        app = Starlette(routes=[Mount("", app=static_routes)])
 
         return app
 
-    app, duration = time_operation(create_minimal_server, "minimal server creation")
+    app, duration = await time_operation(create_minimal_server, "minimal server creation")
     return app
 
-def test_uvicorn_startup(app):
+def uvicorn_speedups():
+    """Pick uvloop/httptools when installed, falling back to uvicorn's pure-Python defaults"""
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    return loop, http
+
+async def test_uvicorn_startup(app):
     """Test uvicorn startup with the app"""
     logger.info("=== TESTING UVICORN STARTUP ===")
 
-    def start_uvicorn():
-        import uvicorn
-        # Start uvicorn in a way that will timeout
-        uvicorn.run(app, host="127.0.0.1", port=8081, log_level="debug")
+    loop, http = uvicorn_speedups()
+    logger.info("Using loop=%s, http=%s", loop, http)
+
+    # Time the uvicorn import and config on their own so the serve timing
+    # below only covers startup
+    config, duration = await time_operation(
+        lambda: uvicorn.Config(app, host="127.0.0.1", port=8081, log_level="debug" if DEBUG_STARTUP else "info", http=http),
+        "uvicorn import and config"
+    )
+    if config is None:
+        return None, duration
+
+    async def start_uvicorn():
+        # Serve on the running loop so the timeout cancels it cleanly; the loop
+        # implementation itself is chosen when main() is started
+        await uvicorn.Server(config).serve()
 
     # This should hang if there's an issue
-    result, duration = time_operation(start_uvicorn, "uvicorn startup", timeout=5)
+    result, duration = await time_operation(start_uvicorn, "uvicorn startup", timeout=5)
     return result, duration
 
-def test_full_minimal_server():
+async def test_full_minimal_server():
     """Test the full minimal server startup"""
     logger.info("=== TESTING FULL MINIMAL SERVER ===")
 
-    app = test_minimal_server_creation()
+    app = await test_minimal_server_creation()
     if app is None:
         logger.error("Failed to create app, skipping uvicorn test")
         return
 
-    result, duration = test_uvicorn_startup(app)
+    result, duration = await test_uvicorn_startup(app)
     return result, duration
 
-def main():
+async def main():
+    _setup_logging()
     logger.info("Starting server startup debugging...")
 
     # Test the full minimal server
-    test_full_minimal_server()
+    await test_full_minimal_server()
 
     logger.info("Server startup debugging complete. Check debug_server_startup.log for details.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    loop_factory = None
+    if uvicorn_speedups()[0] == "uvloop":
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    asyncio.run(main(), loop_factory=loop_factory)
\ No newline at end of file
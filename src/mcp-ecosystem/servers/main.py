@@ -13,15 +13,29 @@ Key features:
 - SSE-based communication for real-time memory operations
 """
 
+import asyncio
 import contextvars
-import json
+from collections import Counter, OrderedDict
 import logging
+import re
 import os
+import signal
 import secrets
+import threading
 import hashlib
 import hmac
+import ipaddress
+import itertools
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Any
 
+import httpx
+import orjson
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -32,9 +46,64 @@ from mcp.server.sse import SseServerTransport
 # from mem0.client import MemoryClient
 from starlette.routing import Route
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 
+@dataclass(frozen=True)
+class EnvConf:
+    """Snapshot of the environment settings this server reads."""
+    mem0_api_key: str
+    qdrant_host: str
+    qdrant_port: int
+    ollama_host: str
+    ollama_model: str
+    ollama_embedding_model: str
+    llama_cpp_model: str
+    llama_cpp_embedding_model: str
+    allowed_api_keys: frozenset[bytes]
+    token_key: bytes  # JWT_SECRET, fitted to a blake2s key
+    redis_url: str
+    trust_forwarded_for: bool
+
+def _blake2s_key(secret: bytes) -> bytes:
+    """blake2s keys are at most 32 bytes; longer secrets are hashed down to fit."""
+    if len(secret) <= hashlib.blake2s.MAX_KEY_SIZE:
+        return secret
+    return hashlib.blake2s(secret).digest()
+
+def load_env_conf() -> EnvConf:
+    """Read all settings from the environment in one pass."""
+    llama_cpp_model = os.getenv("LLAMA_CPP_MODEL", "")
+    return EnvConf(
+        mem0_api_key=os.getenv("MEM0_API_KEY", ""),
+        qdrant_host=os.getenv("QDRANT_HOST", "localhost"),
+        qdrant_port=int(os.getenv("QDRANT_PORT", "6333")),
+        ollama_host=os.getenv("OLLAMA_HOST", ""),
+        ollama_model=os.getenv("OLLAMA_MODEL", "llama3.1:latest"),
+        ollama_embedding_model=os.getenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text"),
+        llama_cpp_model=llama_cpp_model,
+        llama_cpp_embedding_model=os.getenv("LLAMA_CPP_EMBEDDING_MODEL", llama_cpp_model),
+        # An empty set means no keys are configured
+        allowed_api_keys=frozenset(key.encode() for key in os.getenv("ALLOWED_API_KEYS", "").split(",") if key),
+        token_key=_blake2s_key(os.getenv("JWT_SECRET", "default-secret-change-in-production").encode()),
+        redis_url=os.getenv("REDIS_URL", ""),
+        trust_forwarded_for=os.getenv("TRUST_FORWARDED_FOR", "").lower() in ("1", "true", "yes"),
+    )
+
+_env = load_env_conf()
+
+def reload_env(signum=None, frame=None):
+    """Re-read .env and the environment; installed as the SIGHUP handler."""
+    global _env, _memory_client_initialized
+
+    load_dotenv(override=True)
+    _env = load_env_conf()
+    # Let the next tool call re-check the memory client against the new config
+    _memory_client_initialized = False
+    logger.info("Environment configuration reloaded")
+
 # Initialize FastMCP server for mem0 tools
 mcp = FastMCP("mem0-mcp-server")
 
@@ -55,45 +124,196 @@ client_name_var: contextvars.ContextVar[str] = contextvars.ContextVar("client_na
 
 # Global memory client instance
 _memory_client: Optional[Any] = None
-_memory_client_config_hash: Optional[str] = None
-
-# Delay memory client initialization to avoid startup hangs
+# Settings the current client was built from; compared on re-initialization
+_memory_client_config: Optional[tuple] = None
+# "cloud" (MemoryClient) or "local" (Memory), recorded when the client is built
+_client_kind: Optional[str] = None
+# CloudOps/LocalOps bound to _memory_client; what the tools call into
+_memory_ops: Optional[Any] = None
+
+# Connection pool handed to the cloud MemoryClient. Sized for batch fan-out,
+# where several worker threads share the client's keep-alive connections
+_http_client: Optional[httpx.Client] = None
+HTTP_MAX_CONNECTIONS = 50
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+
+# Set once the client has been built (or failed to build). warm_memory_client
+# does this at startup; get_memory_ops covers calls that arrive before it ends
 _memory_client_initialized = False
+# Serializes (re)builds, which run on worker threads, so concurrent tool calls
+# wait for one build instead of seeing a half-initialized client
+_memory_client_lock = threading.Lock()
 
 # Performance optimizations
-_memory_cache = {}  # Simple in-memory cache for frequent queries
 CACHE_TTL_SECONDS = 300  # 5 minutes cache TTL
+CACHE_MAX_ENTRIES = 100
+# Search results keyed by (operation, user_id, query, limit, tags)
+_memory_cache: "TTLCache[tuple[str, str, str, int, str], str]" = TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
 BATCH_SIZE_LIMIT = 10  # Maximum batch size for operations
+# Worker threads for blocking memory-client calls made via asyncio.to_thread
+THREAD_POOL_WORKERS = 64
+# Per-user memory statistics, seeded from one full scan and then kept up to
+# date by the add/delete tools; reseeded after CACHE_TTL_SECONDS to bound drift
+# from server-side deduplication or writes by other processes
+_stats_cache: dict[str, dict] = {}
+
+# Caps concurrent adds against the memory client across all batch calls
+_batch_semaphore = asyncio.Semaphore(BATCH_SIZE_LIMIT)
+
+# Keyword categories for get_memory_stats, one alternation per category.
+# Plain substrings (no word boundaries), matching the original keyword checks
+_CATEGORY_PATTERNS = {
+    'technical': re.compile(r'code|function|api|programming|script'),
+    'user-related': re.compile(r'user|customer|person|profile'),
+    'issues': re.compile(r'error|bug|issue|problem'),
+    'configuration': re.compile(r'config|setup|install|deploy'),
+}
 
 # Security settings
 API_KEY_HEADER = "X-API-Key"
 MAX_REQUESTS_PER_MINUTE = 60
 REQUEST_WINDOW_SECONDS = 60
 
-# Rate limiting storage (in production, use Redis)
-_rate_limit_store = {}
+# Rate limiting storage: a Redis sliding-window log shared by all workers when
+# REDIS_URL is set, otherwise (or if Redis is unreachable) an in-process store
+_redis: Optional[Any] = None
+_rate_limit_script: Optional[Any] = None
+# In-process fallback, kept in least-recently-seen order and capped
+_rate_limit_store: "OrderedDict[str, dict]" = OrderedDict()
+RATE_LIMIT_MAX_KEYS = 10_000
+RATE_LIMIT_SWEEP_INTERVAL = 100  # Calls between expiry sweeps
+RATE_LIMIT_SWEEP_SIZE = 16  # Oldest keys examined per sweep
+_rate_limit_calls = 0
+
+# Trims the key's log to the window, then admits and records the request if
+# there is room. Returns the remaining quota, or -1 when the limit is hit
+_RATE_LIMIT_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2]) * 1000
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    return -1
+end
+redis.call('ZADD', KEYS[1], now, now .. ':' .. ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window)
+return limit - count - 1
+"""
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result to a compact JSON string."""
+    # Results are read by the model, not people, so skip the indentation
+    return orjson.dumps(obj).decode()
+
+def _loads(data: str) -> Any:
+    """Parse a JSON tool argument."""
+    return orjson.loads(data)
 
 def verify_api_key(api_key: str) -> bool:
     """Verify API key against allowed keys."""
-    allowed_keys = os.getenv("ALLOWED_API_KEYS", "").split(",")
-    if not allowed_keys or allowed_keys == [""]:
+    if not _env.allowed_api_keys:
         # If no keys configured, allow all (for development)
         return True
-    return api_key in allowed_keys
+    # Compare against every key in constant time so response timing doesn't
+    # reveal how much of a guessed key matched
+    candidate = api_key.encode()
+    ok = False
+    for key in _env.allowed_api_keys:
+        ok |= hmac.compare_digest(candidate, key)
+    return ok
+
+# Token nonces: a per-process random seed mixed with a counter. Unique within
+# the process and unpredictable from outside, without a urandom read per token
+_NONCE_SEED = secrets.randbits(64)
+_nonce_counter = itertools.count()
+
+def _nonce() -> str:
+    return (_NONCE_SEED ^ next(_nonce_counter)).to_bytes(8, "little").hex()
 
 def generate_user_token(user_id: str, client_name: str) -> str:
     """Generate a secure token for user identification."""
-    secret = os.getenv("JWT_SECRET", "default-secret-change-in-production")
-    message = f"{user_id}:{client_name}:{secrets.token_hex(16)}"
-    return hmac.new(secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+    message = f"{user_id}:{client_name}:{_nonce()}"
+    # Keyed blake2s is a MAC on its own, without HMAC's double hashing
+    return hashlib.blake2s(message.encode(), key=_env.token_key, digest_size=16).hexdigest()
+
+async def configure_executor():
+    """Size the default executor that asyncio.to_thread runs blocking client calls on."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=THREAD_POOL_WORKERS, thread_name_prefix="mem0")
+    )
 
-def check_rate_limit(client_ip: str, user_id: str) -> bool:
+async def init_rate_limiter():
+    """Connect the Redis rate limiter if REDIS_URL is configured."""
+    global _redis, _rate_limit_script
+
+    if not _env.redis_url:
+        return
+
+    try:
+        import redis.asyncio as redis_asyncio
+        client = redis_asyncio.Redis.from_url(_env.redis_url)
+        # Load the script up front so a bad URL shows up at startup; the
+        # registered Script reloads itself if Redis later loses it
+        await client.script_load(_RATE_LIMIT_LUA)
+        _rate_limit_script = client.register_script(_RATE_LIMIT_LUA)
+        _redis = client
+        logger.info("Using Redis rate limiter")
+    except Exception as e:
+        logger.warning("Redis rate limiter unavailable, using in-memory store: %s", e)
+
+async def close_rate_limiter():
+    """Close the Redis connection pool, if one was opened."""
+    global _redis, _rate_limit_script
+
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+        _rate_limit_script = None
+
+async def close_http_client():
+    """Close the shared Mem0 connection pool, if one was opened."""
+    global _http_client
+
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+
+async def check_rate_limit(client_ip: str, user_id: str) -> bool:
     """Check if request is within rate limits."""
     key = f"{client_ip}:{user_id}"
-    current_time = secrets.randbelow(1000000)  # Simple time simulation
 
-    if key not in _rate_limit_store:
+    if _rate_limit_script is not None:
+        try:
+            # Wall-clock milliseconds, since workers on different hosts share the log
+            remaining = await _rate_limit_script(
+                keys=[f"ratelimit:{key}"],
+                args=[time.time_ns() // 1_000_000, REQUEST_WINDOW_SECONDS, MAX_REQUESTS_PER_MINUTE, uuid.uuid4().hex],
+            )
+            return remaining >= 0
+        except Exception as e:
+            logger.warning("Redis rate limit check failed, using in-memory store: %s", e)
+
+    global _rate_limit_calls
+
+    current_time = time.monotonic()
+
+    # Every so often drop expired windows from the least recently seen end,
+    # where idle keys collect, instead of scanning the whole store
+    _rate_limit_calls += 1
+    if _rate_limit_calls % RATE_LIMIT_SWEEP_INTERVAL == 0:
+        for _ in range(min(RATE_LIMIT_SWEEP_SIZE, len(_rate_limit_store))):
+            oldest_key, oldest = next(iter(_rate_limit_store.items()))
+            if current_time - oldest["window_start"] <= REQUEST_WINDOW_SECONDS:
+                break
+            del _rate_limit_store[oldest_key]
+
+    if key in _rate_limit_store:
+        _rate_limit_store.move_to_end(key)
+    else:
         _rate_limit_store[key] = {"count": 0, "window_start": current_time}
+        if len(_rate_limit_store) > RATE_LIMIT_MAX_KEYS:
+            _rate_limit_store.popitem(last=False)
 
     window_data = _rate_limit_store[key]
 
@@ -109,6 +329,24 @@ def check_rate_limit(client_ip: str, user_id: str) -> bool:
     window_data["count"] += 1
     return True
 
+@lru_cache(maxsize=10_000)
+def normalize_client_ip(raw_ip: str) -> str:
+    """Canonicalize a client address; validated once per distinct value."""
+    try:
+        return str(ipaddress.ip_address(raw_ip))
+    except ValueError:
+        return "unknown"
+
+def get_client_ip(request: Request) -> str:
+    """Resolve the client address, honouring X-Forwarded-For behind a trusted proxy."""
+    if _env.trust_forwarded_for:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            # Only the right-most entry, appended by the trusted proxy itself,
+            # is reliable; anything to its left is client-supplied
+            return normalize_client_ip(forwarded_for.rsplit(",", 1)[-1].strip())
+    return request.client.host if request.client else "unknown"
+
 async def authenticate_request(request: Request) -> dict:
     """Authenticate incoming requests."""
     # Check API key
@@ -120,10 +358,10 @@ async def authenticate_request(request: Request) -> dict:
         )
 
     # Rate limiting
-    client_ip = request.client.host if request.client else "unknown"
+    client_ip = get_client_ip(request)
     user_id = request.path_params.get("user_id", "anonymous")
 
-    if not check_rate_limit(client_ip, user_id):
+    if not await check_rate_limit(client_ip, user_id):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Rate limit exceeded"
@@ -131,55 +369,111 @@ async def authenticate_request(request: Request) -> dict:
 
     return {"user_id": user_id, "client_ip": client_ip}
 
+class CloudOps:
+    """Memory operations against the cloud Mem0 API (MemoryClient)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def add(self, text: str, uid: str, **kwargs):
+        messages = [{"role": "user", "content": text}]
+        return self.client.add(messages, user_id=uid, output_format="v1.1", **kwargs)
+
+    def search(self, query: str, uid: str):
+        return self.client.search(query, user_id=uid, output_format="v1.1")
+
+    def get_all(self, uid: str):
+        return self.client.get_all(user_id=uid, page=1, page_size=50)
+
+    def delete_all(self, uid: str):
+        return self.client.delete_all(user_id=uid)
+
+class LocalOps:
+    """Memory operations against a local OpenMemory deployment (Memory)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def add(self, text: str, uid: str, **kwargs):
+        return self.client.add(text, user_id=uid, **kwargs)
+
+    def search(self, query: str, uid: str):
+        return self.client.search(query, user_id=uid)
+
+    def get_all(self, uid: str):
+        return self.client.get_all(user_id=uid)
+
+    def delete_all(self, uid: str):
+        return self.client.delete_all(user_id=uid)
+
 def get_memory_client_safe():
     """Get memory client with error handling and connection pooling. Returns None if client cannot be initialized."""
-    global _memory_client, _memory_client_config_hash, _memory_client_initialized
+    global _memory_client_initialized
 
-    # Only initialize once
-    if _memory_client_initialized:
-        return _memory_client
+    with _memory_client_lock:
+        # Only initialize once
+        if _memory_client_initialized:
+            return _memory_client
 
-    _memory_client_initialized = True
+        _memory_client_initialized = True
+        return _build_memory_client()
+
+def _build_memory_client():
+    """(Re)build the memory client for the current config; called with _memory_client_lock held."""
+    global _memory_client, _memory_client_config, _client_kind, _memory_ops, _http_client
 
     try:
-        # Generate config hash to detect changes
-        config_parts = [
-            os.getenv("MEM0_API_KEY", ""),
-            os.getenv("QDRANT_HOST", "localhost"),
-            os.getenv("QDRANT_PORT", "6333"),
-            os.getenv("OLLAMA_HOST", ""),
-            os.getenv("LLAMA_CPP_MODEL", "")
-        ]
-        current_config_hash = hashlib.md5("|".join(config_parts).encode()).hexdigest()
-
-        # Reinitialize if config changed
-        if _memory_client_config_hash != current_config_hash:
-            logging.info("Memory client config changed, reinitializing...")
+        current_config = (
+            _env.mem0_api_key,
+            _env.qdrant_host,
+            _env.qdrant_port,
+            _env.ollama_host,
+            _env.ollama_model,
+            _env.ollama_embedding_model,
+            _env.llama_cpp_model,
+            _env.llama_cpp_embedding_model,
+        )
+
+        # Reinitialize if config changed (only reachable again after reload_env)
+        if _memory_client_config != current_config:
+            logger.info("Memory client config changed, reinitializing...")
             _memory_client = None
-            _memory_client_config_hash = current_config_hash
+            _memory_client_config = current_config
 
         # Check if we should use cloud Mem0 API or local OpenMemory
-        mem0_api_key = os.getenv("MEM0_API_KEY")
+        mem0_api_key = _env.mem0_api_key
 
         if mem0_api_key:
             # Use cloud Mem0 API
-            logging.info("Using cloud Mem0 API")
-            from mem0.client import MemoryClient
-            if _memory_client is None or not isinstance(_memory_client, MemoryClient):
-                _memory_client = MemoryClient(api_key=mem0_api_key)
-                _memory_client.update_project(custom_instructions=CUSTOM_INSTRUCTIONS)
+            logger.info("Using cloud Mem0 API")
+            if _memory_client is None or _client_kind != "cloud":
+                from mem0.client import MemoryClient
+                if _http_client is None:
+                    _http_client = httpx.Client(
+                        timeout=300,
+                        limits=httpx.Limits(
+                            max_connections=HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                        ),
+                    )
+                # Publish the client only once setup has fully succeeded, so a
+                # failing update_project can't leave a half-built client cached
+                client = MemoryClient(api_key=mem0_api_key, client=_http_client)
+                client.update_project(custom_instructions=CUSTOM_INSTRUCTIONS)
+                _memory_client, _client_kind, _memory_ops = client, "cloud", CloudOps(client)
         else:
             # Use local OpenMemory deployment
-            logging.info("Using local OpenMemory deployment")
-            from mem0 import Memory
-            if _memory_client is None or not isinstance(_memory_client, Memory):
+            logger.info("Using local OpenMemory deployment")
+            if _memory_client is None or _client_kind != "local":
+                from mem0 import Memory
+
                 # Create local memory configuration
                 config = {
                     "vector_store": {
                         "provider": "qdrant",
                         "config": {
-                            "host": os.getenv("QDRANT_HOST", "localhost"),
-                            "port": int(os.getenv("QDRANT_PORT", "6333")),
+                            "host": _env.qdrant_host,
+                            "port": _env.qdrant_port,
                             "collection_name": "mem0"
                         }
                     },
@@ -203,12 +497,12 @@ def get_memory_client_safe():
                 }
 
                 # Check for Ollama configuration
-                if os.getenv("OLLAMA_HOST"):
+                if _env.ollama_host:
                     config["llm"] = {
                         "provider": "ollama",
                         "config": {
-                            "model": os.getenv("OLLAMA_MODEL", "llama3.1:latest"),
-                            "ollama_base_url": os.getenv("OLLAMA_HOST"),
+                            "model": _env.ollama_model,
+                            "ollama_base_url": _env.ollama_host,
                             "temperature": 0.1,
                             "max_tokens": 2000,
                         }
@@ -216,16 +510,16 @@ def get_memory_client_safe():
                     config["embedder"] = {
                         "provider": "ollama",
                         "config": {
-                            "model": os.getenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text"),
-                            "ollama_base_url": os.getenv("OLLAMA_HOST"),
+                            "model": _env.ollama_embedding_model,
+                            "ollama_base_url": _env.ollama_host,
                         }
                     }
                 # Check for llama.cpp configuration
-                elif os.getenv("LLAMA_CPP_MODEL"):
+                elif _env.llama_cpp_model:
                     config["llm"] = {
                         "provider": "llama.cpp",
                         "config": {
-                            "model": os.getenv("LLAMA_CPP_MODEL"),
+                            "model": _env.llama_cpp_model,
                             "temperature": 0.1,
                             "max_tokens": 2000,
                         }
@@ -233,44 +527,39 @@ def get_memory_client_safe():
                     config["embedder"] = {
                         "provider": "llama.cpp",
                         "config": {
-                            "model": os.getenv("LLAMA_CPP_EMBEDDING_MODEL", os.getenv("LLAMA_CPP_MODEL")),
+                            "model": _env.llama_cpp_embedding_model,
                         }
                     }
 
-                _memory_client = Memory.from_config(config_dict=config)
+                client = Memory.from_config(config_dict=config)
+                _memory_client, _client_kind, _memory_ops = client, "local", LocalOps(client)
 
         return _memory_client
     except Exception as e:
-        logging.warning(f"Failed to get memory client: {e}")
+        logger.warning("Failed to get memory client: %s", e)
         return None
 
-def get_cache_key(operation: str, user_id: str, params: dict) -> str:
-    """Generate cache key for memory operations."""
-    param_str = json.dumps(params, sort_keys=True)
-    return f"{operation}:{user_id}:{hashlib.md5(param_str.encode()).hexdigest()}"
+async def get_memory_ops():
+    """Get the operations bound to the memory client, or None if it is unavailable.
 
-def get_cached_result(cache_key: str):
+    A (re)build, e.g. the first call after a SIGHUP reload, imports mem0 and
+    does network I/O, so it runs on a worker thread rather than the event loop.
+    """
+    if not _memory_client_initialized:
+        await asyncio.to_thread(get_memory_client_safe)
+    return _memory_ops if _memory_client else None
+
+async def warm_memory_client():
+    """Build the memory client (and import mem0) at startup instead of on the first tool call."""
+    await asyncio.to_thread(get_memory_client_safe)
+
+def get_cached_result(cache_key: tuple):
     """Get result from cache if valid."""
-    if cache_key in _memory_cache:
-        cached_data = _memory_cache[cache_key]
-        if secrets.randbelow(1000000) - cached_data["timestamp"] < CACHE_TTL_SECONDS:
-            return cached_data["result"]
-        else:
-            # Expired, remove from cache
-            del _memory_cache[cache_key]
-    return None
-
-def set_cached_result(cache_key: str, result):
-    """Cache result with timestamp."""
-    _memory_cache[cache_key] = {
-        "result": result,
-        "timestamp": secrets.randbelow(1000000)  # Simple timestamp simulation
-    }
-
-    # Clean up old cache entries (simple LRU)
-    if len(_memory_cache) > 100:  # Max cache size
-        oldest_key = min(_memory_cache.keys(), key=lambda k: _memory_cache[k]["timestamp"])
-        del _memory_cache[oldest_key]
+    return _memory_cache.get(cache_key)
+
+def set_cached_result(cache_key: tuple, result):
+    """Cache result; TTLCache handles expiry and LRU eviction."""
+    _memory_cache[cache_key] = result
 
 @mcp.tool(
     description="""Add a new memory to mem0 with optional categorization and tagging. This tool stores information for future reference and context.
@@ -291,8 +580,8 @@ async def add_memories(text: str, tags: str = "") -> str:
         tags: Optional comma-separated tags for categorization
     """
     try:
-        memory_client = get_memory_client_safe()
-        if not memory_client:
+        memory_ops = await get_memory_ops()
+        if not memory_ops:
             return "Error: Memory system unavailable"
         
         # Get user context
@@ -305,20 +594,51 @@ async def add_memories(text: str, tags: str = "") -> str:
         metadata = {"tags": tag_list} if tag_list else {}
 
         # Add memory with user context
-        from mem0.client import MemoryClient
-        if isinstance(memory_client, MemoryClient):
-            # Cloud Mem0 API
-            messages = [{"role": "user", "content": text}]
-            response = memory_client.add(messages, user_id=uid, metadata=metadata, output_format="v1.1")
-        else:
-            # Local OpenMemory
-            response = memory_client.add(text, user_id=uid, metadata=metadata)
+        response = await asyncio.to_thread(memory_ops.add, text, uid, metadata=metadata)
+        _record_added(uid, [response])
 
         tag_info = f" with tags: {', '.join(tag_list)}" if tag_list else ""
         return f"Successfully added memory{tag_info}: {text}"
     except Exception as e:
         return f"Error adding memory: {str(e)}"
 
+def _categorize(memory_text: str) -> list:
+    """Keyword categories a memory text falls into."""
+    memory_text = memory_text.lower()
+    return [category for category, pattern in _CATEGORY_PATTERNS.items() if pattern.search(memory_text)]
+
+def _record_added(uid: str, responses: list):
+    """Fold the outcome of add calls into the user's stats, if they are being tracked.
+
+    mem0 may store, merge, drop or delete memories for each add, so this counts
+    the ADD/DELETE events it reports rather than the texts that were sent.
+    """
+    entry = _stats_cache.get(uid)
+    if entry is None:
+        return
+    for response in responses:
+        events = response.get("results", []) if isinstance(response, dict) else response
+        if not isinstance(events, list):
+            continue
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            categories = Counter(_categorize(str(event.get("memory", ""))))
+            if event.get("event") == "ADD":
+                entry["total"] += 1
+                entry["tags"].update(categories)
+            elif event.get("event") == "DELETE":
+                entry["total"] = max(entry["total"] - 1, 0)
+                entry["tags"] -= categories
+
+def _get_all_memories_impl(memory_ops, uid: str) -> list:
+    """Fetch all memory texts for a user as a Python list."""
+    memories = memory_ops.get_all(uid)
+
+    if isinstance(memories, dict) and 'results' in memories:
+        return [memory["memory"] for memory in memories["results"]]
+    return memories
+
 @mcp.tool(
     description="""Retrieve all stored memories for the user. Call this tool when you need 
     complete context of all previously stored information. This is useful when:
@@ -334,34 +654,36 @@ async def get_all_memories() -> str:
     Returns a JSON formatted list of all stored memories.
     """
     try:
-        memory_client = get_memory_client_safe()
-        if not memory_client:
+        memory_ops = await get_memory_ops()
+        if not memory_ops:
             return "Error: Memory system unavailable"
         
         # Get user context
         uid = user_id_var.get(DEFAULT_USER_ID)
-        
-        # Get all memories with user context
-        from mem0.client import MemoryClient
-        if isinstance(memory_client, MemoryClient):
-            # Cloud Mem0 API
-            memories = memory_client.get_all(user_id=uid, page=1, page_size=50)
-            if isinstance(memories, dict) and 'results' in memories:
-                flattened_memories = [memory["memory"] for memory in memories["results"]]
-            else:
-                flattened_memories = memories
-        else:
-            # Local OpenMemory
-            memories = memory_client.get_all(user_id=uid)
-            if isinstance(memories, dict) and 'results' in memories:
-                flattened_memories = [memory["memory"] for memory in memories["results"]]
-            else:
-                flattened_memories = memories
-        
-        return json.dumps(flattened_memories, indent=2)
+
+        return _dumps(await asyncio.to_thread(_get_all_memories_impl, memory_ops, uid))
     except Exception as e:
         return f"Error getting memories: {str(e)}"
 
+def _search_memories_impl(memory_ops, uid: str, query: str, limit: int, filter_tags: list) -> list:
+    """Search a user's memories and return the matching texts as a Python list."""
+    memories = memory_ops.search(query, uid)
+
+    if isinstance(memories, dict) and 'results' in memories:
+        all_memories = memories["results"]
+    else:
+        all_memories = memories if isinstance(memories, list) else []
+
+    # Apply tag filtering if specified
+    if filter_tags:
+        filtered_memories = []
+        for memory in all_memories:
+            memory_tags = memory.get('metadata', {}).get('tags', [])
+            if any(tag in memory_tags for tag in filter_tags):
+                filtered_memories.append(memory)
+        return [memory["memory"] for memory in filtered_memories[:limit]]
+    return [memory["memory"] for memory in all_memories[:limit]]
+
 @mcp.tool(
     description="""Search through stored memories using semantic search with optional tag filtering. This tool should be called
     for EVERY user query to find relevant information. It helps find:
@@ -386,8 +708,8 @@ async def search_memories(query: str, limit: int = 5, tags: str = "") -> str:
         tags: Optional comma-separated tags to filter results.
     """
     try:
-        memory_client = get_memory_client_safe()
-        if not memory_client:
+        memory_ops = await get_memory_ops()
+        if not memory_ops:
             return "Error: Memory system unavailable"
 
         # Get user context
@@ -397,41 +719,13 @@ async def search_memories(query: str, limit: int = 5, tags: str = "") -> str:
         filter_tags = [tag.strip() for tag in tags.split(',') if tag.strip()] if tags else []
 
         # Check cache first (include tags in cache key)
-        cache_key = get_cache_key("search", uid, {"query": query, "limit": limit, "tags": tags})
+        cache_key = ("search", uid, query, limit, tags)
         cached_result = get_cached_result(cache_key)
         if cached_result and not filter_tags:
-            logging.info(f"Cache hit for search: {query}")
+            logger.info("Cache hit for search: %s", query)
             return cached_result
 
-        # Perform search
-        from mem0.client import MemoryClient
-        if isinstance(memory_client, MemoryClient):
-            # Cloud Mem0 API
-            memories = memory_client.search(query, user_id=uid, output_format="v1.1")
-            if isinstance(memories, dict) and 'results' in memories:
-                all_memories = memories["results"]
-            else:
-                all_memories = memories if isinstance(memories, list) else []
-        else:
-            # Local OpenMemory
-            memories = memory_client.search(query, user_id=uid)
-            if isinstance(memories, dict) and 'results' in memories:
-                all_memories = memories["results"]
-            else:
-                all_memories = memories if isinstance(memories, list) else []
-
-        # Apply tag filtering if specified
-        if filter_tags:
-            filtered_memories = []
-            for memory in all_memories:
-                memory_tags = memory.get('metadata', {}).get('tags', [])
-                if any(tag in memory_tags for tag in filter_tags):
-                    filtered_memories.append(memory)
-            flattened_memories = [memory["memory"] for memory in filtered_memories[:limit]]
-        else:
-            flattened_memories = [memory["memory"] for memory in all_memories[:limit]]
-
-        result = json.dumps(flattened_memories, indent=2)
+        result = _dumps(await asyncio.to_thread(_search_memories_impl, memory_ops, uid, query, limit, filter_tags))
 
         # Cache the result (only for non-filtered searches to avoid cache explosion)
         if not filter_tags:
@@ -439,7 +733,7 @@ async def search_memories(query: str, limit: int = 5, tags: str = "") -> str:
 
         return result
     except Exception as e:
-        logging.error(f"Error searching memories: {e}")
+        logger.error("Error searching memories: %s", e)
         return f"Error searching memories: {str(e)}"
 
 @mcp.tool(
@@ -457,8 +751,8 @@ async def delete_memories(query: str = "", tags: str = "", delete_all: bool = Fa
     Returns a success message indicating how many memories were deleted.
     """
     try:
-        memory_client = get_memory_client_safe()
-        if not memory_client:
+        memory_ops = await get_memory_ops()
+        if not memory_ops:
             return "Error: Memory system unavailable"
 
         # Get user context
@@ -466,16 +760,13 @@ async def delete_memories(query: str = "", tags: str = "", delete_all: bool = Fa
 
         if delete_all:
             # Delete all memories
-            from mem0.client import MemoryClient
-            if isinstance(memory_client, MemoryClient):
-                memory_client.delete_all(user_id=uid)
-            else:
-                memory_client.delete_all(user_id=uid)
+            await asyncio.to_thread(memory_ops.delete_all, uid)
 
             # Clear cache for this user
-            keys_to_remove = [k for k in _memory_cache.keys() if f":{uid}:" in k]
+            keys_to_remove = [k for k in _memory_cache.keys() if k[1] == uid]
             for key in keys_to_remove:
-                del _memory_cache[key]
+                _memory_cache.pop(key, None)
+            _stats_cache[uid] = {"seeded_at": time.monotonic(), "total": 0, "tags": Counter()}
 
             return "Successfully deleted all memories"
 
@@ -485,20 +776,16 @@ async def delete_memories(query: str = "", tags: str = "", delete_all: bool = Fa
             # the API to support selective deletion by IDs
 
             # First search to find memories to delete
-            search_result = await search_memories(query=query, tags=tags, limit=100)
-            try:
-                memories_to_delete = json.loads(search_result)
-                delete_count = len(memories_to_delete)
+            filter_tags = [tag.strip() for tag in tags.split(',') if tag.strip()] if tags else []
+            memories_to_delete = await asyncio.to_thread(_search_memories_impl, memory_ops, uid, query, 100, filter_tags)
+            delete_count = len(memories_to_delete)
 
-                if delete_count == 0:
-                    return "No memories found matching the criteria"
+            if delete_count == 0:
+                return "No memories found matching the criteria"
 
-                # For now, we can't selectively delete individual memories via API
-                # This would require memory IDs, which aren't exposed in the current API
-                return f"Found {delete_count} memories matching criteria, but selective deletion is not yet supported. Use delete_all=true to delete all memories."
-
-            except json.JSONDecodeError:
-                return "Error parsing search results for deletion"
+            # For now, we can't selectively delete individual memories via API
+            # This would require memory IDs, which aren't exposed in the current API
+            return f"Found {delete_count} memories matching criteria, but selective deletion is not yet supported. Use delete_all=true to delete all memories."
 
         else:
             return "Error: Must specify either query/tags or delete_all=true"
@@ -510,45 +797,47 @@ async def delete_memories(query: str = "", tags: str = "", delete_all: bool = Fa
     description="""Add multiple memories in a batch for better performance. Use this when you need to store
     several related pieces of information at once. This is more efficient than calling add_memories multiple times."""
 )
-async def batch_add_memories(memories: str) -> str:
+async def batch_add_memories(memories: str | list[str]) -> str:
     """Add multiple memories in a batch operation.
 
     Args:
-        memories: JSON array of memory strings to add, e.g., ["memory 1", "memory 2", "memory 3"]
+        memories: Memory strings to add, as a list or a JSON array string, e.g., ["memory 1", "memory 2", "memory 3"]
     """
     try:
-        memory_client = get_memory_client_safe()
-        if not memory_client:
+        memory_ops = await get_memory_ops()
+        if not memory_ops:
             return "Error: Memory system unavailable"
 
         # Parse memories
-        try:
-            memory_list = json.loads(memories)
+        if isinstance(memories, list):
+            memory_list = memories
+        else:
+            try:
+                memory_list = _loads(memories)
+            except orjson.JSONDecodeError:
+                return "Error: invalid JSON format for memories"
             if not isinstance(memory_list, list):
                 return "Error: memories must be a JSON array"
-            if len(memory_list) > BATCH_SIZE_LIMIT:
-                return f"Error: batch size limited to {BATCH_SIZE_LIMIT} memories"
-        except json.JSONDecodeError:
-            return "Error: invalid JSON format for memories"
+        if len(memory_list) > BATCH_SIZE_LIMIT:
+            return f"Error: batch size limited to {BATCH_SIZE_LIMIT} memories"
 
         # Get user context
         uid = user_id_var.get(DEFAULT_USER_ID)
 
+        async def add_one(memory_text):
+            async with _batch_semaphore:
+                return await asyncio.to_thread(memory_ops.add, memory_text, uid)
+
+        # The client is blocking, so run the adds side by side on worker threads
+        responses = await asyncio.gather(*(add_one(text) for text in memory_list), return_exceptions=True)
+
         results = []
-        for memory_text in memory_list:
-            try:
-                from mem0.client import MemoryClient
-                if isinstance(memory_client, MemoryClient):
-                    # Cloud Mem0 API
-                    messages = [{"role": "user", "content": memory_text}]
-                    response = memory_client.add(messages, user_id=uid, output_format="v1.1")
-                    results.append(f"✓ Added: {memory_text[:50]}...")
-                else:
-                    # Local OpenMemory
-                    response = memory_client.add(memory_text, user_id=uid)
-                    results.append(f"✓ Added: {memory_text[:50]}...")
-            except Exception as e:
-                results.append(f"✗ Failed: {memory_text[:50]}... - {str(e)}")
+        for memory_text, response in zip(memory_list, responses):
+            if isinstance(response, Exception):
+                results.append(f"✗ Failed: {memory_text[:50]}... - {str(response)}")
+            else:
+                results.append(f"✓ Added: {memory_text[:50]}...")
+        _record_added(uid, [response for response in responses if not isinstance(response, Exception)])
 
         return f"Batch operation completed:\n" + "\n".join(results)
     except Exception as e:
@@ -564,55 +853,36 @@ async def get_memory_stats() -> str:
     Returns a JSON object with memory statistics.
     """
     try:
-        memory_client = get_memory_client_safe()
-        if not memory_client:
+        memory_ops = await get_memory_ops()
+        if not memory_ops:
             return "Error: Memory system unavailable"
 
         # Get user context
         uid = user_id_var.get(DEFAULT_USER_ID)
 
-        # Get all memories to analyze
-        all_memories_result = await get_all_memories()
-        try:
-            memories = json.loads(all_memories_result)
+        entry = _stats_cache.get(uid)
+        if entry is None or time.monotonic() - entry["seeded_at"] >= CACHE_TTL_SECONDS:
+            # Seed from all memories
+            memories = await asyncio.to_thread(_get_all_memories_impl, memory_ops, uid)
             if not isinstance(memories, list):
                 memories = []
-        except json.JSONDecodeError:
-            memories = []
 
-        # Analyze memories for statistics
-        total_memories = len(memories)
-
-        # Extract tags from metadata (this is a simplified analysis)
-        # In a real implementation, you'd want the API to provide this data
-        tag_counts = {}
-        for memory in memories:
             # Since we don't have direct access to metadata in the current API response,
-            # we'll do a basic keyword analysis for common categories
-            memory_text = memory.lower() if isinstance(memory, str) else str(memory).lower()
-
-            # Simple categorization based on keywords
-            categories = []
-            if any(word in memory_text for word in ['code', 'function', 'api', 'programming', 'script']):
-                categories.append('technical')
-            if any(word in memory_text for word in ['user', 'customer', 'person', 'profile']):
-                categories.append('user-related')
-            if any(word in memory_text for word in ['error', 'bug', 'issue', 'problem']):
-                categories.append('issues')
-            if any(word in memory_text for word in ['config', 'setup', 'install', 'deploy']):
-                categories.append('configuration')
-
-            for category in categories:
-                tag_counts[category] = tag_counts.get(category, 0) + 1
+            # we do a basic keyword analysis for common categories
+            tags = Counter()
+            for memory in memories:
+                tags.update(_categorize(memory if isinstance(memory, str) else str(memory)))
+            entry = _stats_cache[uid] = {"seeded_at": time.monotonic(), "total": len(memories), "tags": tags}
 
+        tag_counts = dict(entry["tags"])
         stats = {
-            "total_memories": total_memories,
+            "total_memories": entry["total"],
             "tag_distribution": tag_counts,
             "categories": list(tag_counts.keys()),
             "most_common_category": max(tag_counts.keys(), key=lambda k: tag_counts[k]) if tag_counts else None
         }
 
-        return json.dumps(stats, indent=2)
+        return _dumps(stats)
     except Exception as e:
         return f"Error getting memory stats: {str(e)}"
 
@@ -631,7 +901,7 @@ def create_starlette_app(mcp_server, *, debug: bool = False):
         client_token = client_name_var.set(client_name)
 
         # Log authenticated access
-        logging.info(f"Authenticated MCP connection: user={uid}, client={client_name}, ip={auth_data['client_ip']}")
+        logger.info("Authenticated MCP connection: user=%s, client=%s, ip=%s", uid, client_name, auth_data['client_ip'])
 
         try:
             async with sse.connect_sse(
@@ -645,7 +915,7 @@ def create_starlette_app(mcp_server, *, debug: bool = False):
                     mcp_server.create_initialization_options(),
                 )
         except Exception as e:
-            logging.error(f"MCP session error for user {uid}: {e}")
+            logger.error("MCP session error for user %s: %s", uid, e)
             raise
         finally:
             user_id_var.reset(user_token)
@@ -662,6 +932,8 @@ def create_starlette_app(mcp_server, *, debug: bool = False):
             Route("/messages/", endpoint=sse.handle_post_message, methods=["POST"]),
             Route("/health", endpoint=health_check, methods=["GET"]),
         ],
+        on_startup=[configure_executor, init_rate_limiter, warm_memory_client],
+        on_shutdown=[close_rate_limiter, close_http_client],
     )
 
 if __name__ == "__main__":
@@ -671,6 +943,10 @@ if __name__ == "__main__":
     parser.add_argument('--host', default='0.0.0.0', help='Host to bind to')
     parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '8080')), help='Port to listen on')
     args = parser.parse_args()
+
+    # Re-read configuration on SIGHUP (not available on Windows)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, reload_env)
     
     # Bind SSE request handling to MCP server
     mcp_server = mcp._mcp_server
@@ -5,69 +5,114 @@ Minimal MCP server that bypasses the problematic imports
 
 import logging
 import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def uvicorn_speedups():
+    """Pick uvloop/httptools when installed, falling back to uvicorn's pure-Python defaults"""
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    return loop, http
+
+def create_app():
+    """Build the Starlette app with the MCP SSE routes (uvicorn app factory)"""
+    # Import only what we need, here rather than at module level so import
+    # failures surface through main()'s startup error handling
+    import orjson
+    from mcp.server.fastmcp import FastMCP
+    from mcp.server.sse import SseServerTransport
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Route
+
+    logger.info("✓ Core imports successful")
+
+    # Create minimal MCP server
+    mcp = FastMCP("mem0-mcp-minimal")
+
+    @mcp.tool()
+    async def health_check() -> str:
+        """Check if the server is running"""
+        return "MCP server is running"
+
+    logger.info("✓ MCP server created with health check tool")
+
+    # Create Starlette app
+    sse = SseServerTransport("/messages/")
+
+    # The health payload never changes, so encode it once. Each request still
+    # gets its own Response, since middleware may edit its headers in place
+    health_body = orjson.dumps({"status": "healthy", "server": "mem0-mcp-minimal"})
+
+    async def health_endpoint(request):
+        return Response(health_body, media_type="application/json")
+
+    async def handle_sse(request):
+        async with sse.connect_sse(
+            request.scope, request.receive, request._send
+        ) as (read_stream, write_stream):
+            await mcp._mcp_server.run(
+                read_stream, write_stream,
+                mcp._mcp_server.create_initialization_options()
+            )
+
+    async def handle_post_message(request):
+        return await sse.handle_post_message(request)
+
+    app = Starlette(routes=[
+        Route("/mcp/default_client/sse/default_user", endpoint=handle_sse, methods=["GET"]),
+        Route("/messages/", endpoint=handle_post_message, methods=["POST"]),
+        Route("/health", endpoint=health_endpoint, methods=["GET"]),
+    ])
+
+    logger.info("✓ Starlette app created")
+    return app
+
 def main():
+    # Load environment variables; containers with injected env can skip the scan
+    if os.environ.get("SKIP_DOTENV") != "1":
+        from dotenv import load_dotenv
+        load_dotenv()
+
     try:
         logger.info("Starting minimal MCP server...")
 
-        # Import only what we need
-        from fastapi import FastAPI
         import uvicorn
-        from mcp.server.fastmcp import FastMCP
-        from mcp.server.sse import SseServerTransport
-
-        logger.info("✓ Core imports successful")
-
-        # Create minimal MCP server
-        mcp = FastMCP("mem0-mcp-minimal")
-
-        @mcp.tool()
-        async def health_check() -> str:
-            """Check if the server is running"""
-            return "MCP server is running"
-
-        logger.info("✓ MCP server created with health check tool")
-
-        # Create Starlette app
-        from starlette.applications import Starlette
-        from starlette.routing import Route, Mount
-        from starlette.responses import JSONResponse
-
-        sse = SseServerTransport("/messages/")
-
-        async def handle_sse(request):
-            async with sse.connect_sse(
-                request.scope, request.receive, request._send
-            ) as (read_stream, write_stream):
-                await mcp._mcp_server.run(
-                    read_stream, write_stream,
-                    mcp._mcp_server.create_initialization_options()
-                )
-
-        async def health_endpoint(request):
-            return JSONResponse({"status": "healthy", "server": "mem0-mcp-minimal"})
-
-        async def handle_post_message(request):
-            return await sse.handle_post_message(request)
-
-        app = Starlette(routes=[
-            Route("/mcp/default_client/sse/default_user", endpoint=handle_sse, methods=["GET"]),
-            Route("/messages/", endpoint=handle_post_message, methods=["POST"]),
-            Route("/health", endpoint=health_endpoint, methods=["GET"]),
-        ])
-
-        logger.info("✓ Starlette app created")
-        logger.info("Starting server on port 8080...")
 
-        uvicorn.run(app, host="0.0.0.0", port=8080, log_level="info")
+        # SSE sessions live in the worker that opened them, so only scale out
+        # (WEB_CONCURRENCY > 1) behind a proxy with sticky sessions
+        workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+        if workers > 1:
+            # uvicorn starts the factory in each worker from its import string
+            app, factory = "minimal_server:create_app", True
+        else:
+            # Build in-process so startup failures are reported below
+            app, factory = create_app(), False
+
+        # uvicorn[standard] ships uvloop/httptools, but not on every platform
+        loop, http = uvicorn_speedups()
+        logger.info(f"Starting server on port 8080 with {workers} worker(s), loop={loop}, http={http}...")
+
+        uvicorn.run(
+            app,
+            factory=factory,
+            host="0.0.0.0",
+            port=8080,
+            loop=loop,
+            http=http,
+            workers=workers,
+            log_level="info",
+        )
 
     except Exception as e:
         logger.error(f"Failed to start server: {e}")
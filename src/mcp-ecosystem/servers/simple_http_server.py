@@ -3,34 +3,48 @@
 Simple HTTP server for testing PM2 management
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import argparse
 import json
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# The health payload never changes, so encode it once
+_HEALTH_BODY = json.dumps({'status': 'healthy', 'server': 'simple-http-server'}).encode()
+_HEALTH_LEN = str(len(_HEALTH_BODY))
+
 class SimpleHandler(BaseHTTPRequestHandler):
+    quiet = False
+
     def do_GET(self):
         if self.path == '/health':
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', _HEALTH_LEN)
             self.end_headers()
-            response = {'status': 'healthy', 'server': 'simple-http-server'}
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(_HEALTH_BODY)
         else:
             self.send_response(404)
             self.end_headers()
             self.wfile.write(b'Not Found')
 
     def log_message(self, format, *args):
-        logger.info(f"HTTP {format % args}")
+        if not self.quiet:
+            logger.info(f"HTTP {format % args}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Run simple HTTP health server')
+    parser.add_argument('--quiet', action='store_true', help='Disable per-request logging')
+    args = parser.parse_args()
+
+    SimpleHandler.quiet = args.quiet
+
     server_address = ('0.0.0.0', 8080)
-    httpd = HTTPServer(server_address, SimpleHandler)
+    httpd = ThreadingHTTPServer(server_address, SimpleHandler)
     logger.info("Starting simple HTTP server on port 8080...")
     httpd.serve_forever()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -5,15 +5,22 @@ Simple test of Mem0 memory operations
 
 import os
 import time
+import uuid
 from dotenv import load_dotenv
 
-load_dotenv()
+# Skip the .env scan when the key is already in the environment (e.g. in CI)
+if 'MEM0_API_KEY' not in os.environ:
+    load_dotenv()
+
+MEM0_API_KEY = os.environ.get('MEM0_API_KEY')
 
 from mem0.client.main import MemoryClient
 
 def main():
-    client = MemoryClient(api_key=os.getenv('MEM0_API_KEY'))
-    user_id = f'test_user_{int(time.time())}'
+    client = MemoryClient(api_key=MEM0_API_KEY)
+    # One random suffix per run keeps both user ids unique without clock calls
+    suffix = uuid.uuid4().hex[:8]
+    user_id = f'test_user_{suffix}'
 
     print(f"Testing with user_id: {user_id}")
 
@@ -29,8 +36,12 @@ def main():
 
     # Test 3: Get memories
     print("\n3. Getting memories...")
-    time.sleep(1)  # Small delay
-    memories = client.get_all(user_id=user_id, page=1, page_size=10)
+    # Poll briefly instead of a fixed delay; ingestion is often already done
+    for _ in range(10):
+        memories = client.get_all(user_id=user_id, page=1, page_size=10)
+        if memories and (not isinstance(memories, dict) or memories.get('results')):
+            break
+        time.sleep(0.1)
     print(f"Memories: {memories}")
 
     # Test 4: Search memories
@@ -40,7 +51,7 @@ def main():
 
     # Test 5: Different user
     print("\n5. Testing different user...")
-    user2 = f'test_user2_{int(time.time())}'
+    user2 = f'test_user2_{suffix}'
     client.add([{'role': 'user', 'content': 'Different user memory'}], user_id=user2, output_format='v1.1')
     memories_user2 = client.get_all(user_id=user2, page=1, page_size=10)
     print(f"User2 memories: {memories_user2}")
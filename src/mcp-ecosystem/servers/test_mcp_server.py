@@ -4,23 +4,184 @@ Test script for Mem0 MCP Server
 Tests all memory operations via STDIO interface
 """
 
+import atexit
+import itertools
+import os
+import selectors
 import subprocess
-import json
 import sys
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
-def send_mcp_message(process: subprocess.Popen, message: Dict[str, Any]) -> Dict[str, Any]:
-    """Send a message to MCP server and get response"""
-    message_json = json.dumps(message) + "\n"
-    process.stdin.write(message_json.encode())
+import orjson
+
+SERVER_COMMAND = ("uv", "run", "python3", "mem0_server.py")
+SERVER_CWD = "/Users/lorenzorasmussen/Projects/mem0/mem0-mcp"
+
+# JSON-RPC envelope shared by every request; only id, method and params vary
+_ENVELOPE = b'{"jsonrpc":"2.0","id":%d,"method":"%s","params":%s}\n'
+
+def make_msg(id_: int, method: str, params: bytes) -> bytes:
+    """Build a newline-terminated JSON-RPC request from pre-encoded params"""
+    return _ENVELOPE % (id_, method.encode(), params)
+
+# JSON-RPC ids, unique across every run against a reused server, so a late
+# reply to a request from an earlier (timed-out) run never matches a new one
+_request_ids = itertools.count(1)
+
+def next_request(method: str, params: bytes) -> Tuple[int, bytes]:
+    """Assign a fresh id and build the request around pre-encoded params"""
+    request_id = next(_request_ids)
+    return request_id, make_msg(request_id, method, params)
+
+# Test request params, encoded once at import; ids are assigned per send
+INIT_PARAMS = orjson.dumps({
+    "protocolVersion": "2024-11-05",
+    "capabilities": {},
+    "clientInfo": {
+        "name": "test-client",
+        "version": "1.0.0"
+    }
+})
+TOOLS_PARAMS = b"{}"
+ADD_PARAMS = orjson.dumps({
+    "name": "add_memory",
+    "arguments": {
+        "text": "Test memory from MCP integration test",
+        "user_id": "test_user"
+    }
+})
+GET_PARAMS = orjson.dumps({
+    "name": "get_memories",
+    "arguments": {
+        "user_id": "test_user",
+        "limit": 5
+    }
+})
+SEARCH_PARAMS = orjson.dumps({
+    "name": "search_memories",
+    "arguments": {
+        "query": "test",
+        "user_id": "test_user",
+        "limit": 3
+    }
+})
+DELETE_PARAMS = orjson.dumps({
+    "name": "delete_all_memories",
+    "arguments": {
+        "user_id": "test_user"
+    }
+})
+
+# Running servers keyed on their launch arguments, reused across test runs
+_server_processes: Dict[Tuple[Tuple[str, ...], str], subprocess.Popen] = {}
+
+# Bytes read from each server's stdout but not yet consumed as lines, keyed by
+# pid. stdout is read with os.read rather than the buffered file object, so
+# select() on the fd never misses lines already pulled into a Python buffer.
+_stdout_buffers: Dict[int, bytearray] = {}
+
+def get_server_process(command: Tuple[str, ...] = SERVER_COMMAND, cwd: str = SERVER_CWD) -> Tuple[subprocess.Popen, bool]:
+    """Return a running MCP server for these arguments, starting one if needed.
+
+    The second element is True when the process was freshly started.
+    """
+    key = (command, cwd)
+    process = _server_processes.get(key)
+    if process is not None and process.poll() is None:
+        return process, False
+
+    process = subprocess.Popen(
+        list(command),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        # Nothing reads stderr, and a full pipe would stall a long-lived server
+        stderr=subprocess.DEVNULL,
+        cwd=cwd,
+        bufsize=1 << 16,
+        text=False
+    )
+    _server_processes[key] = process
+    return process, True
+
+def _discard_server_process(process: subprocess.Popen):
+    """Stop a server and forget it so the next run starts a fresh one"""
+    for key, cached in list(_server_processes.items()):
+        if cached is process:
+            del _server_processes[key]
+    _stdout_buffers.pop(process.pid, None)
+    if process.poll() is None:
+        process.terminate()
+        process.wait()
+
+def _stop_server_processes():
+    """Terminate every server started by get_server_process"""
+    for process in _server_processes.values():
+        if process.poll() is None:
+            process.terminate()
+            process.wait()
+    _server_processes.clear()
+    _stdout_buffers.clear()
+
+atexit.register(_stop_server_processes)
+
+def _read_responses(process: subprocess.Popen, request_ids, timeout: float) -> Dict[int, Dict[str, Any]]:
+    """Poll stdout in short slices until every id is answered, the process exits, or the deadline passes.
+
+    Responses may arrive in any order and may be interleaved with
+    notifications, so they are collected by id.
+    """
+    pending = set(request_ids)
+    responses = {}
+    fd = process.stdout.fileno()
+    buffer = _stdout_buffers.setdefault(process.pid, bytearray())
+    deadline = time.monotonic() + timeout
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while pending:
+            # Consume complete lines already read before waiting on the fd again
+            newline = buffer.find(b"\n")
+            if newline >= 0:
+                response_line = bytes(buffer[:newline]).strip()
+                del buffer[:newline + 1]
+                if response_line:
+                    response = orjson.loads(response_line)
+                    if response.get("id") in pending:
+                        pending.discard(response["id"])
+                        responses[response["id"]] = response
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if not selector.select(timeout=min(remaining, 0.1)):
+                continue
+            chunk = os.read(fd, 1 << 16)
+            if not chunk:
+                # EOF: the server exited
+                break
+            buffer += chunk
+    return responses
+
+def wait_for_response(process: subprocess.Popen, request_id: int, request: bytes, timeout: float = 10.0) -> Dict[str, Any]:
+    """Send a message and wait until the server answers, instead of sleeping first.
+
+    The request sits in the pipe until the server starts reading, so it is
+    sent once and stdout is polled until a reply arrives.
+    """
+    process.stdin.write(request)
     process.stdin.flush()
+    return _read_responses(process, (request_id,), timeout).get(request_id, {})
+
+def send_many(process: subprocess.Popen, requests: Dict[int, bytes], timeout: float = 10.0) -> Dict[int, Dict[str, Any]]:
+    """Pipeline several encoded requests, keyed by id, in a single write and collect responses by id.
 
-    # Read response
-    response_line = process.stdout.readline().decode().strip()
-    if response_line:
-        return json.loads(response_line)
-    return {}
+    The server may handle pipelined requests concurrently and in any order,
+    so only pass requests that do not depend on each other.
+    """
+    process.stdin.write(b"".join(requests.values()))
+    process.stdin.flush()
+    return _read_responses(process, requests, timeout)
 
 def test_mcp_server():
     """Test the MCP server functionality"""
@@ -28,56 +189,31 @@ def test_mcp_server():
     print("🧪 Testing Mem0 MCP Server")
     print("=" * 50)
 
-    # Start the MCP server
+    # Start the MCP server, or reuse one left running by an earlier run
     try:
-        process = subprocess.Popen(
-            ["uv", "run", "python3", "mem0_server.py"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd="/Users/lorenzorasmussen/Projects/mem0/mem0-mcp",
-            text=False
-        )
+        process, fresh = get_server_process()
     except Exception as e:
         print(f"❌ Failed to start server: {e}")
         return False
 
-    time.sleep(2)  # Wait for server to initialize
-
+    initialized = not fresh
     try:
-        # Test 1: Initialize connection
+        # Test 1: Initialize connection (a reused server already completed it)
         print("1️⃣  Testing server initialization...")
-        init_message = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {
-                    "name": "test-client",
-                    "version": "1.0.0"
-                }
-            }
-        }
-
-        response = send_mcp_message(process, init_message)
-        if "result" in response:
-            print("✅ Server initialized successfully")
+        if not fresh:
+            print("✅ Reusing already initialized server")
         else:
-            print(f"❌ Initialization failed: {response}")
-            return False
+            response = wait_for_response(process, *next_request("initialize", INIT_PARAMS))
+            if "result" in response:
+                initialized = True
+                print("✅ Server initialized successfully")
+            else:
+                print(f"❌ Initialization failed: {response}")
+                _discard_server_process(process)
+                return False
 
-        # Test 2: List tools
         print("\n2️⃣  Testing tool listing...")
-        tools_message = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list",
-            "params": {}
-        }
-
-        response = send_mcp_message(process, tools_message)
+        response = wait_for_response(process, *next_request("tools/list", TOOLS_PARAMS))
         if "result" in response and "tools" in response["result"]:
             tools = response["result"]["tools"]
             print(f"✅ Found {len(tools)} tools:")
@@ -87,88 +223,41 @@ def test_mcp_server():
             print(f"❌ Tool listing failed: {response}")
             return False
 
-        # Test 3: Add memory
+        # Mutations must run in order, so they are sent one at a time
         print("\n3️⃣  Testing memory addition...")
-        add_message = {
-            "jsonrpc": "2.0",
-            "id": 3,
-            "method": "tools/call",
-            "params": {
-                "name": "add_memory",
-                "arguments": {
-                    "text": "Test memory from MCP integration test",
-                    "user_id": "test_user"
-                }
-            }
-        }
-
-        response = send_mcp_message(process, add_message)
+        response = wait_for_response(process, *next_request("tools/call", ADD_PARAMS))
         if "result" in response:
             print("✅ Memory added successfully")
         else:
             print(f"❌ Memory addition failed: {response}")
             return False
 
-        # Test 4: Get memories
+        # Retrieval and search only read what was added, so pipeline them
+        get_id, get_request = next_request("tools/call", GET_PARAMS)
+        search_id, search_request = next_request("tools/call", SEARCH_PARAMS)
+        responses = send_many(process, {
+            get_id: get_request,
+            search_id: search_request,
+        })
+
         print("\n4️⃣  Testing memory retrieval...")
-        get_message = {
-            "jsonrpc": "2.0",
-            "id": 4,
-            "method": "tools/call",
-            "params": {
-                "name": "get_memories",
-                "arguments": {
-                    "user_id": "test_user",
-                    "limit": 5
-                }
-            }
-        }
-
-        response = send_mcp_message(process, get_message)
+        response = responses.get(get_id, {})
         if "result" in response:
             print("✅ Memories retrieved successfully")
         else:
             print(f"❌ Memory retrieval failed: {response}")
             return False
 
-        # Test 5: Search memories
         print("\n5️⃣  Testing memory search...")
-        search_message = {
-            "jsonrpc": "2.0",
-            "id": 5,
-            "method": "tools/call",
-            "params": {
-                "name": "search_memories",
-                "arguments": {
-                    "query": "test",
-                    "user_id": "test_user",
-                    "limit": 3
-                }
-            }
-        }
-
-        response = send_mcp_message(process, search_message)
+        response = responses.get(search_id, {})
         if "result" in response:
             print("✅ Memory search successful")
         else:
             print(f"❌ Memory search failed: {response}")
             return False
 
-        # Test 6: Delete all memories
         print("\n6️⃣  Testing memory deletion...")
-        delete_message = {
-            "jsonrpc": "2.0",
-            "id": 6,
-            "method": "tools/call",
-            "params": {
-                "name": "delete_all_memories",
-                "arguments": {
-                    "user_id": "test_user"
-                }
-            }
-        }
-
-        response = send_mcp_message(process, delete_message)
+        response = wait_for_response(process, *next_request("tools/call", DELETE_PARAMS))
         if "result" in response:
             print("✅ Memories deleted successfully")
         else:
@@ -180,11 +269,9 @@ def test_mcp_server():
 
     except Exception as e:
         print(f"❌ Test failed with exception: {e}")
+        if not initialized:
+            _discard_server_process(process)
         return False
-    finally:
-        # Clean up
-        process.terminate()
-        process.wait()
 
 if __name__ == "__main__":
     success = test_mcp_server()
@@ -7,65 +7,86 @@ Tests all core functionality including add_memory, get_memories, user_id handlin
 import os
 import sys
 import time
-import json
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from dotenv import load_dotenv
 
-# Load environment
-load_dotenv()
+# Load environment, unless it was already injected (e.g. in CI)
+if "MEM0_API_KEY" not in os.environ:
+    load_dotenv()
+
+MEM0_API_KEY = os.environ.get("MEM0_API_KEY")
+QDRANT_HOST = os.environ.get("QDRANT_HOST", "localhost")
+QDRANT_PORT = int(os.environ.get("QDRANT_PORT", "6333"))
+
+def _unwrap_results(response):
+    """Cloud responses wrap the list in {'results': [...]}"""
+    if isinstance(response, dict) and 'results' in response:
+        return response['results']
+    return response
 
 def get_memory_client():
-    """Get memory client"""
+    """Get memory client as a table of operations bound to its API flavour"""
     try:
-        mem0_api_key = os.getenv("MEM0_API_KEY")
-        if mem0_api_key:
+        if MEM0_API_KEY:
             from mem0.client.main import MemoryClient
-            return MemoryClient(api_key=mem0_api_key)
+            client = MemoryClient(api_key=MEM0_API_KEY)
+            return {
+                "add": lambda text, user_id: client.add(
+                    [{"role": "user", "content": text}], user_id=user_id, output_format="v1.1"
+                ),
+                "get": lambda user_id, limit: _unwrap_results(
+                    client.get_all(user_id=user_id, page=1, page_size=limit)
+                ),
+                "search": lambda query, user_id: client.search(
+                    query, user_id=user_id, output_format="v1.1"
+                ),
+                "delete_all": lambda user_id: client.delete_all(user_id=user_id),
+            }
         else:
             from mem0 import Memory
-            return Memory(
+            client = Memory(
                 config={
                     "vector_store": {
                         "provider": "qdrant",
                         "config": {
-                            "host": os.getenv("QDRANT_HOST", "localhost"),
-                            "port": int(os.getenv("QDRANT_PORT", "6333")),
+                            "host": QDRANT_HOST,
+                            "port": QDRANT_PORT,
                             "collection_name": "mem0"
                         }
                     }
                 }
             )
+            return {
+                "add": lambda text, user_id: client.add(text, user_id=user_id),
+                "get": lambda user_id, limit: client.get(user_id=user_id),
+                "search": lambda query, user_id: client.search(query, user_id=user_id),
+                "delete_all": lambda user_id: client.delete_all(user_id=user_id),
+            }
     except Exception as e:
         print(f"Failed to initialize memory client: {e}")
         return None
 
-def test_add_memory(client, text: str, user_id: str = "test_user") -> bool:
+@lru_cache(maxsize=512)
+def _search_cached(search, query: str, user_id: str):
+    """Search memories, reusing results for repeated queries until the next write"""
+    return search(query, user_id)
+
+def test_add_memory(ops, text: str, user_id: str = "test_user") -> bool:
     """Test adding a memory"""
     try:
-        from mem0.client.main import MemoryClient
-        if isinstance(client, MemoryClient):
-            messages = [{"role": "user", "content": text}]
-            result = client.add(messages, user_id=user_id, output_format="v1.1")
-        else:
-            result = client.add(text, user_id=user_id)
+        result = ops["add"](text, user_id)
+        _search_cached.cache_clear()
         print(f"✅ Added memory: {text[:50]}...")
         return True
     except Exception as e:
         print(f"❌ Failed to add memory: {e}")
         return False
 
-def test_get_memories(client, user_id: str = "test_user", limit: int = 10) -> bool:
+def test_get_memories(ops, user_id: str = "test_user", limit: int = 10) -> bool:
     """Test getting memories"""
     try:
-        from mem0.client.main import MemoryClient
-        if isinstance(client, MemoryClient):
-            memories = client.get_all(user_id=user_id, page=1, page_size=limit)
-            if isinstance(memories, dict) and 'results' in memories:
-                results = memories['results']
-            else:
-                results = memories
-        else:
-            results = client.get(user_id=user_id)
+        results = ops["get"](user_id, limit)
 
         if results:
             print(f"✅ Retrieved {len(results)} memories for user {user_id}")
@@ -80,18 +101,14 @@ def test_get_memories(client, user_id: str = "test_user", limit: int = 10) -> bo
         print(f"❌ Failed to get memories: {e}")
         return False
 
-def test_search_memories(client, query: str, user_id: str = "test_user", limit: int = 5) -> bool:
+def test_search_memories(ops, query: str, user_id: str = "test_user", limit: int = 5) -> bool:
     """Test searching memories"""
     try:
-        from mem0.client.main import MemoryClient
-        if isinstance(client, MemoryClient):
-            results = client.search(query, user_id=user_id, output_format="v1.1")
-            if isinstance(results, dict) and 'results' in results:
-                memories = results['results']
-            else:
-                memories = results
+        results = _search_cached(ops["search"], query, user_id)
+        if isinstance(results, dict) and 'results' in results:
+            memories = results['results']
         else:
-            memories = client.search(query, user_id=user_id)
+            memories = results
 
         if memories:
             print(f"✅ Search '{query}' found {len(memories)} results")
@@ -106,35 +123,49 @@ def test_search_memories(client, query: str, user_id: str = "test_user", limit:
         print(f"❌ Failed to search memories: {e}")
         return False
 
-def test_delete_all_memories(client, user_id: str = "test_user") -> bool:
+def test_delete_all_memories(ops, user_id: str = "test_user") -> bool:
     """Test deleting all memories"""
     try:
-        from mem0.client.main import MemoryClient
-        if isinstance(client, MemoryClient):
-            client.delete_all(user_id=user_id)
-        else:
-            client.delete_all(user_id=user_id)
+        ops["delete_all"](user_id)
+        _search_cached.cache_clear()
         print(f"✅ Deleted all memories for user {user_id}")
         return True
     except Exception as e:
         print(f"❌ Failed to delete memories: {e}")
         return False
 
-def test_batch_add_memories(client, memories: list, user_id: str = "test_user") -> bool:
+def add_memories_concurrently(ops, items: list) -> list:
+    """Add (text, user_id) pairs concurrently; returns None or the exception per item"""
+    add = ops["add"]
+
+    def add_one(item):
+        return add(*item)
+
+    # Each add is a blocking network round-trip, so overlap them
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(items)))) as executor:
+        futures = [executor.submit(add_one, item) for item in items]
+
+    errors = []
+    for future in futures:
+        try:
+            future.result()
+            errors.append(None)
+        except Exception as e:
+            errors.append(e)
+    _search_cached.cache_clear()
+    return errors
+
+def test_batch_add_memories(ops, memories: list, user_id: str = "test_user") -> bool:
     """Test batch adding memories"""
     try:
+        errors = add_memories_concurrently(ops, [(memory_text, user_id) for memory_text in memories])
+
         results = []
-        from mem0.client.main import MemoryClient
-        for i, memory_text in enumerate(memories):
-            try:
-                if isinstance(client, MemoryClient):
-                    messages = [{"role": "user", "content": memory_text}]
-                    client.add(messages, user_id=user_id, output_format="v1.1")
-                else:
-                    client.add(memory_text, user_id=user_id)
+        for i, error in enumerate(errors):
+            if error is None:
                 results.append(f"✓ Memory {i+1} added")
-            except Exception as e:
-                results.append(f"✗ Memory {i+1} failed: {str(e)}")
+            else:
+                results.append(f"✗ Memory {i+1} failed: {str(error)}")
 
         print(f"✅ Batch operation completed: {len([r for r in results if r.startswith('✓')])}/{len(memories)} successful")
         return True
@@ -148,8 +179,8 @@ def run_comprehensive_tests():
     print("=" * 60)
 
     # Initialize client
-    client = get_memory_client()
-    if not client:
+    ops = get_memory_client()
+    if not ops:
         print("❌ Failed to initialize memory client")
         return False
 
@@ -172,63 +203,95 @@ def run_comprehensive_tests():
 
     special_chars_memory = "User's code snippet: def hello():\n    print('Hello, 世界! 🌍')\n    return 'café & naïve résumé'"
 
+    batch_memories = [
+        "Batch memory 1: User likes hiking",
+        "Batch memory 2: User has a cat named Whiskers",
+        "Batch memory 3: User prefers tea over coffee"
+    ]
+
+    # Tests 1, 3 and 6 only need their adds to land before the reads in tests
+    # 4-6, so submit them in one concurrent wave up front and map each outcome
+    # back to its test. Test 7's batch must follow those reads, so it waits.
+    planned_adds = [
+        ("Basic Add Memory", "test_user_1", ["Test memory for basic functionality"]),
+        ("Multiple Additions", "test_user_1", test_memories[:5]),
+        ("User Isolation", "test_user_2", ["Memory for user 2"]),
+    ]
+    add_errors = add_memories_concurrently(
+        ops,
+        [(text, user_id) for _, user_id, texts in planned_adds for text in texts]
+    )
+    add_outcomes = {}
+    offset = 0
+    for name, _, texts in planned_adds:
+        add_outcomes[name] = add_errors[offset:offset + len(texts)]
+        offset += len(texts)
+
+    def report_adds(name: str) -> bool:
+        errors = add_outcomes[name]
+        added = sum(1 for error in errors if error is None)
+        for error in errors:
+            if error is not None:
+                print(f"❌ Failed to add memory: {error}")
+        if added:
+            print(f"✅ Added {added}/{len(errors)} memories")
+        return added == len(errors)
+
     # Test 1: Basic add memory
     print("\n1️⃣  Testing basic memory addition...")
-    success = test_add_memory(client, "Test memory for basic functionality", "test_user_1")
+    success = report_adds("Basic Add Memory")
     test_results.append(("Basic Add Memory", success))
 
     # Test 2: Add memory with special characters
     print("\n2️⃣  Testing memory addition with special characters...")
-    success = test_add_memory(client, special_chars_memory, "test_user_1")
+    success = test_add_memory(ops, special_chars_memory, "test_user_1")
     test_results.append(("Special Characters", success))
 
     # Test 3: Add multiple memories
     print("\n3️⃣  Testing multiple memory additions...")
-    success_count = 0
-    for i, memory in enumerate(test_memories[:5]):
-        if test_add_memory(client, memory, "test_user_1"):
-            success_count += 1
-    success = success_count == 5
+    success = report_adds("Multiple Additions")
     test_results.append(("Multiple Additions", success))
 
     # Test 4: Get memories
     print("\n4️⃣  Testing memory retrieval...")
-    success = test_get_memories(client, "test_user_1")
+    success = test_get_memories(ops, "test_user_1")
     test_results.append(("Get Memories", success))
 
     # Test 5: Search memories
     print("\n5️⃣  Testing memory search...")
-    success = test_search_memories(client, "programming", "test_user_1")
+    success = test_search_memories(ops, "programming", "test_user_1")
     test_results.append(("Search Memories", success))
 
     # Test 6: User isolation
     print("\n6️⃣  Testing user isolation...")
-    test_add_memory(client, "Memory for user 2", "test_user_2")
-    memories_user1 = test_get_memories(client, "test_user_1", limit=1)
-    memories_user2 = test_get_memories(client, "test_user_2", limit=1)
-    success = memories_user1 and memories_user2  # Both should succeed
+    added = report_adds("User Isolation")
+    # The two lookups are independent, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        memories_user1, memories_user2 = executor.map(
+            lambda user_id: test_get_memories(ops, user_id, limit=1),
+            ("test_user_1", "test_user_2")
+        )
+    success = added and memories_user1 and memories_user2  # All should succeed
     test_results.append(("User Isolation", success))
 
     # Test 7: Batch add memories
     print("\n7️⃣  Testing batch memory addition...")
-    batch_memories = [
-        "Batch memory 1: User likes hiking",
-        "Batch memory 2: User has a cat named Whiskers",
-        "Batch memory 3: User prefers tea over coffee"
-    ]
-    success = test_batch_add_memories(client, batch_memories, "test_user_1")
+    add_outcomes["Batch Add"] = add_memories_concurrently(
+        ops, [(text, "test_user_1") for text in batch_memories]
+    )
+    success = report_adds("Batch Add")
     test_results.append(("Batch Add", success))
 
     # Test 8: Persistence across sessions (simulate by getting again)
     print("\n8️⃣  Testing persistence (retrieval after additions)...")
-    success = test_get_memories(client, "test_user_1")
+    success = test_get_memories(ops, "test_user_1")
     test_results.append(("Persistence", success))
 
     # Test 9: Error handling - invalid user_id
     print("\n9️⃣  Testing error handling...")
     try:
         # Try with None user_id
-        test_add_memory(client, "Test error handling", None)
+        test_add_memory(ops, "Test error handling", None)
         success = False  # Should have failed
     except:
         success = True  # Expected to fail
@@ -236,26 +299,26 @@ def run_comprehensive_tests():
 
     # Test 10: Delete all memories
     print("\n🔟 Testing memory deletion...")
-    success = test_delete_all_memories(client, "test_user_1")
+    success = test_delete_all_memories(ops, "test_user_1")
     test_results.append(("Delete All", success))
 
     # Verify deletion
     print("\n🔍 Verifying deletion...")
-    memories_after_delete = test_get_memories(client, "test_user_1")
+    memories_after_delete = test_get_memories(ops, "test_user_1")
     # Note: Some systems may not immediately reflect deletion
 
     # Performance test
     print("\n⚡ Performance test (adding 10 memories)...")
     perf_start = time.time()
-    perf_success = test_batch_add_memories(client, test_memories, "perf_test_user")
+    perf_success = test_batch_add_memories(ops, test_memories, "perf_test_user")
     perf_time = time.time() - perf_start
     print(".2f")
     test_results.append(("Performance", perf_success and perf_time < 30))  # Should take less than 30 seconds
 
-    # Clean up
-    test_delete_all_memories(client, "test_user_1")
-    test_delete_all_memories(client, "test_user_2")
-    test_delete_all_memories(client, "perf_test_user")
+    # Clean up all test users concurrently
+    cleanup_users = ("test_user_1", "test_user_2", "perf_test_user")
+    with ThreadPoolExecutor(max_workers=len(cleanup_users)) as executor:
+        list(executor.map(lambda user_id: test_delete_all_memories(ops, user_id), cleanup_users))
 
     # Summary
     total_time = time.time() - start_time
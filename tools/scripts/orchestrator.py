@@ -4,14 +4,72 @@ OpenCode Orchestrator Engine
 Spawns and coordinates multiple child agents with summary aggregation
 """
 
+import asyncio
 import json
-import subprocess
+import os
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, fields
 
-@dataclass
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _encode(obj, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+# Child agent prompt with the orchestrator summary protocol
+PROMPT_TEMPLATE = """
+{objective}
+
+**Expected Deliverables:**
+{deliverables}
+
+**Important:** When you complete your work, provide a summary in the parent orchestrator session using this format:
+
+## Agent Summary: {agent_name}
+**Status:** ✅ Complete
+
+### Tasks Completed
+[List what you accomplished]
+
+### Key Deliverables
+[Paths to files you created]
+
+### Decisions Made
+[Important choices you made]
+
+### Recommendations
+[Next steps or suggestions]
+
+Working directory: {work_dir}
+"""
+
+# One agent's section of the aggregated orchestration report
+_AGENT_SECTION = """
+### {title}
+
+**Objective:** {objective}
+
+**Deliverables:**
+{deliverables}
+
+**Summary:**
+{summary}
+
+---
+
+"""
+
+@dataclass(slots=True)
 class AgentTask:
     """Represents a task assigned to an agent"""
     agent_name: str
@@ -21,8 +79,22 @@ class AgentTask:
     status: str = "pending"  # pending, spawned, in_progress, complete, blocked
     session_id: Optional[str] = None
     summary: Optional[str] = None
+    # Rendered once and reused across respawns and reports; runtime-only, so
+    # they are left out of session.json
+    deliverables_block: Optional[str] = field(default=None, repr=False, metadata={"persist": False})
+    rendered_prompt: Optional[str] = field(default=None, repr=False, metadata={"persist": False})
+    work_dir: Optional[Path] = field(default=None, repr=False, metadata={"persist": False})
     
-@dataclass
+    def get_deliverables_block(self) -> str:
+        """Deliverables as a markdown bullet list"""
+        if self.deliverables_block is None:
+            self.deliverables_block = "\n".join(f"- {d}" for d in self.deliverables)
+        return self.deliverables_block
+    
+# AgentTask fields written to the session snapshot
+_PERSISTED_TASK_FIELDS = tuple(f.name for f in fields(AgentTask) if f.metadata.get("persist", True))
+
+@dataclass(slots=True)
 class OrchestratorSession:
     """Orchestrator session state"""
     session_id: str
@@ -32,23 +104,61 @@ class OrchestratorSession:
     phase: str
     status: str
 
+def load_session(orchestration_dir: Path) -> dict:
+    """Rebuild session state from the last snapshot plus its change log"""
+    
+    state = json.loads((orchestration_dir / "session.json").read_text())
+    tasks = {t["agent_name"]: t for t in state["tasks"]}
+    
+    log_file = orchestration_dir / "session.log.jsonl"
+    if log_file.exists():
+        with open(log_file) as f:
+            for line in f:
+                delta = json.loads(line)
+                delta.pop("ts", None)
+                task = tasks.get(delta.pop("agent", None))
+                if task is not None:
+                    task.update(delta)
+    
+    return state
+
+# Per-task state codes for the orchestrator's bytearray status table
+_PENDING, _SPAWNED, _COMPLETE = 0, 1, 2
+
 class OpenCodeOrchestrator:
     """Multi-agent orchestration with OpenCode's native agent spawning"""
     
     def __init__(self, project_request: str):
         self.project_request = project_request
-        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # One clock read so session_id, directory and timestamp always agree
+        now = datetime.now()
+        self._now = now
+        self.session_id = now.strftime("%Y%m%d_%H%M%S")
         self.orchestration_dir = Path.home() / f".orchestration/{self.session_id}"
         self.orchestration_dir.mkdir(parents=True, exist_ok=True)
         
+        # Session files stay open for the orchestrator's lifetime; saves only
+        # rewrite/append and flush, durability is forced at _checkpoint()
+        self._session_fp = open(self.orchestration_dir / "session.json", "w+b", buffering=1 << 16)
+        self._log_fp = open(self.orchestration_dir / "session.log.jsonl", "ab", buffering=1 << 16)
+        
         self.session = OrchestratorSession(
             session_id=self.session_id,
             project_name=project_request[:50],
-            timestamp=datetime.now().isoformat(),
+            timestamp=now.isoformat(),
             tasks=[],
             phase="initialization",
             status="active"
         )
+        
+        # Readiness bookkeeping (Kahn's algorithm), filled in by analyze_and_plan.
+        # Parallel arrays indexed by position in session.tasks.
+        self._index: Dict[str, int] = {}
+        self._indegree: List[int] = []
+        self._dependents: List[List[int]] = []
+        self._ready: deque = deque()
+        self._state = bytearray()
+        self._done: List[asyncio.Event] = []
     
     def analyze_and_plan(self):
         """Analyze project and create task breakdown"""
@@ -61,8 +171,15 @@ class OpenCodeOrchestrator:
         # Create task plan based on project
         tasks = self._generate_task_plan()
         
+        # Create every task directory in one pass and keep its Path on the task
+        for task in tasks:
+            task.work_dir = self.orchestration_dir / task.agent_name
+            task.work_dir.mkdir(exist_ok=True)
+        
         self.session.tasks = tasks
+        self._index_dependencies(tasks)
         self._save_session()
+        self._checkpoint()
         
         print(f"📋 Created {len(tasks)} agent tasks")
         print()
@@ -161,43 +278,137 @@ class OpenCodeOrchestrator:
             dependencies=["builder"]
         ))
         
-        return tasks
+        # Validate the graph, then order tasks so each follows its dependencies
+        self._check_dependencies(tasks)
+        return self._topo_sort(tasks)
+    
+    @staticmethod
+    def _check_dependencies(tasks: List[AgentTask]):
+        """Reject unknown dependencies and cycles (iterative three-colour DFS)"""
+        
+        WHITE, GRAY, BLACK = 0, 1, 2
+        deps = {t.agent_name: t.dependencies for t in tasks}
+        for name, task_deps in deps.items():
+            for dep in task_deps:
+                if dep not in deps:
+                    raise ValueError(f"Task '{name}' depends on unknown task '{dep}'")
+        
+        color = dict.fromkeys(deps, WHITE)
+        for root in deps:
+            if color[root] != WHITE:
+                continue
+            color[root] = GRAY
+            path = [root]
+            stack = [iter(deps[root])]
+            while stack:
+                dep = next(stack[-1], None)
+                if dep is None:
+                    color[path.pop()] = BLACK
+                    stack.pop()
+                elif color[dep] == GRAY:
+                    cycle = path[path.index(dep):] + [dep]
+                    raise ValueError(f"Dependency cycle: {' -> '.join(cycle)}")
+                elif color[dep] == WHITE:
+                    color[dep] = GRAY
+                    path.append(dep)
+                    stack.append(iter(deps[dep]))
     
-    def spawn_agents(self, phase: str = "all"):
-        """Spawn agents for current phase"""
+    @staticmethod
+    def _topo_sort(tasks: List[AgentTask]) -> List[AgentTask]:
+        """Return validated tasks in dependency order (Kahn's algorithm), stable for ties"""
+        
+        index = {t.agent_name: i for i, t in enumerate(tasks)}
+        indegree = [len(t.dependencies) for t in tasks]
+        dependents: List[List[int]] = [[] for _ in tasks]
+        for i, task in enumerate(tasks):
+            for dep in task.dependencies:
+                dependents[index[dep]].append(i)
+        
+        queue = deque(i for i, d in enumerate(indegree) if d == 0)
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(tasks[i])
+            for j in dependents[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    queue.append(j)
+        
+        return order
+    
+    def _index_dependencies(self, tasks: List[AgentTask]):
+        """Precompute indegrees and reverse edges so readiness is O(V+E) overall"""
+        
+        self._index = {t.agent_name: i for i, t in enumerate(tasks)}
+        self._state = bytearray(len(tasks))
+        self._done = [asyncio.Event() for _ in tasks]
+        self._indegree = [len(t.dependencies) for t in tasks]
+        self._dependents = [[] for _ in tasks]
+        for i, task in enumerate(tasks):
+            for dep in task.dependencies:
+                self._dependents[self._index[dep]].append(i)
+        self._ready = deque(i for i, d in enumerate(self._indegree) if d == 0)
+    
+    async def run(self):
+        """Spawn agents wave by wave until every task has completed"""
+        
+        while _PENDING in self._state or _SPAWNED in self._state:
+            await self.spawn_agents(wait=True)
+    
+    async def spawn_agents(self, phase: str = "all", wait: bool = False):
+        """Spawn agents for current phase, optionally waiting for one to complete"""
         
         # Get tasks for current phase based on dependencies
         ready_tasks = self._get_ready_tasks()
         
         if not ready_tasks:
             print("⏸  No tasks ready to spawn (waiting on dependencies)")
+            if wait:
+                await self._wait_for_completion()
             return
         
         print(f"🚀 Spawning {len(ready_tasks)} agent(s) for parallel execution")
         print()
         
-        for task in ready_tasks:
-            self._spawn_agent(task)
+        await asyncio.gather(*(self._spawn_agent(task) for task in ready_tasks))
         
         # Monitor and wait for completion
-        self._monitor_agents(ready_tasks)
+        await self._monitor_agents(ready_tasks, wait=wait)
     
     def _get_ready_tasks(self) -> List[AgentTask]:
         """Get tasks that are ready to execute (dependencies met)"""
         
-        ready = []
-        completed_agents = [t.agent_name for t in self.session.tasks if t.status == "complete"]
-        
-        for task in self.session.tasks:
-            if task.status == "pending":
-                # Check if all dependencies are complete
-                deps_met = all(dep in completed_agents for dep in task.dependencies)
-                if deps_met:
-                    ready.append(task)
-        
+        # Tasks enter the queue exactly once, when their last dependency completes
+        tasks = self.session.tasks
+        ready = [tasks[i] for i in self._ready]
+        self._ready.clear()
         return ready
     
-    def _spawn_agent(self, task: AgentTask):
+    def complete_agent(self, agent_name: str, summary: Optional[str] = None):
+        """Record an agent's completion and release the tasks waiting on it"""
+        
+        i = self._index[agent_name]
+        if self._state[i] == _COMPLETE:
+            return
+        self._state[i] = _COMPLETE
+        self._done[i].set()
+        task = self.session.tasks[i]
+        task.status = "complete"
+        if summary is not None:
+            task.summary = summary
+        self._on_task_complete(agent_name)
+        self._save_session({"agent": agent_name, "status": task.status, "summary": task.summary})
+    
+    def _on_task_complete(self, agent_name: str):
+        """Decrement dependents' indegrees and queue those that reach zero"""
+        
+        indegree = self._indegree
+        for j in self._dependents[self._index[agent_name]]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                self._ready.append(j)
+    
+    async def _spawn_agent(self, task: AgentTask):
         """Spawn a child agent in new session"""
         
         print(f"🤖 Spawning @{task.agent_name}")
@@ -206,37 +417,13 @@ class OpenCodeOrchestrator:
         print()
         
         # Create agent prompt with orchestrator protocol
-        agent_prompt = f"""
-{task.objective}
-
-**Expected Deliverables:**
-{chr(10).join(f'- {d}' for d in task.deliverables)}
-
-**Important:** When you complete your work, provide a summary in the parent orchestrator session using this format:
-
-## Agent Summary: {task.agent_name}
-**Status:** ✅ Complete
-
-### Tasks Completed
-[List what you accomplished]
-
-### Key Deliverables
-[Paths to files you created]
-
-### Decisions Made
-[Important choices you made]
-
-### Recommendations
-[Next steps or suggestions]
-
-Working directory: {self.orchestration_dir / task.agent_name}
-"""
-        
-        # Save task context
-        task_dir = self.orchestration_dir / task.agent_name
-        task_dir.mkdir(exist_ok=True)
-        
-        (task_dir / "task.md").write_text(agent_prompt)
+        if task.rendered_prompt is None:
+            task.rendered_prompt = PROMPT_TEMPLATE.format(
+                objective=task.objective,
+                deliverables=task.get_deliverables_block(),
+                agent_name=task.agent_name,
+                work_dir=task.work_dir,
+            )
         
         # In OpenCode, spawning happens via @mention in chat
         # This script simulates it and provides the command
@@ -244,12 +431,17 @@ Working directory: {self.orchestration_dir / task.agent_name}
         print(f"      @{task.agent_name} {task.objective[:60]}...")
         print()
         
+        # Save task context (directory is created by analyze_and_plan)
+        task_file = task.work_dir / "task.md"
+        await asyncio.to_thread(task_file.write_text, task.rendered_prompt)
+        
+        self._state[self._index[task.agent_name]] = _SPAWNED
         task.status = "spawned"
         task.session_id = f"{self.session_id}_{task.agent_name}"
-        self._save_session()
+        self._save_session({"agent": task.agent_name, "status": task.status, "session_id": task.session_id})
     
-    def _monitor_agents(self, tasks: List[AgentTask]):
-        """Monitor spawned agents (placeholder for actual implementation)"""
+    async def _monitor_agents(self, tasks: List[AgentTask], wait: bool = False):
+        """Report spawned agents and, if asked, wait for the next completion"""
         
         print("📊 Monitoring Agent Progress")
         print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
@@ -261,9 +453,27 @@ Working directory: {self.orchestration_dir / task.agent_name}
         print("💡 Use Ctrl+Right/Left to navigate between sessions")
         print("💡 Request summaries when agents complete their work")
         print()
+        
+        if wait:
+            await self._wait_for_completion()
     
-    def aggregate_summaries(self):
-        """Aggregate all agent summaries into master report"""
+    async def _wait_for_completion(self):
+        """Sleep until at least one in-flight agent calls complete_agent"""
+        
+        waiters = [
+            asyncio.ensure_future(self._done[i].wait())
+            for i, state in enumerate(self._state) if state == _SPAWNED
+        ]
+        if not waiters:
+            return
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+    
+    def aggregate_summaries(self) -> Path:
+        """Aggregate all agent summaries into master report, returning its path"""
         
         print("📊 Aggregating Agent Summaries")
         print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
@@ -271,12 +481,16 @@ Working directory: {self.orchestration_dir / task.agent_name}
         
         completed_tasks = [t for t in self.session.tasks if t.status == "complete"]
         
-        report = f"""
+        report_file = self.orchestration_dir / "orchestration_report.md"
+        
+        # Stream the report section by section rather than building it in memory
+        with report_file.open("w", encoding="utf-8", buffering=1 << 16) as f:
+            f.write(f"""
 # Project Orchestration Report
 
 **Project:** {self.project_request}
 **Session ID:** {self.session_id}
-**Date:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+**Date:** {self._now.strftime("%Y-%m-%d %H:%M:%S")}
 
 ## Executive Summary
 
@@ -286,39 +500,66 @@ Status: {self.session.status}
 
 ## Agent Summaries
 
-"""
-        
-        for task in completed_tasks:
-            report += f"""
-### {task.agent_name.title()}
-
-**Objective:** {task.objective}
-
-**Deliverables:**
-{chr(10).join(f'- {d}' for d in task.deliverables)}
-
-**Summary:**
-{task.summary or 'Pending summary from agent'}
-
----
-
-"""
+""")
+            
+            for task in completed_tasks:
+                f.write(_AGENT_SECTION.format_map({
+                    "title": task.agent_name.title(),
+                    "objective": task.objective,
+                    "deliverables": task.get_deliverables_block(),
+                    "summary": task.summary or "Pending summary from agent",
+                }))
         
-        # Save master report
-        report_file = self.orchestration_dir / "orchestration_report.md"
-        report_file.write_text(report)
+        self._save_session()
+        self._checkpoint()
         
         print(f"✅ Master report created: {report_file}")
         print()
         
-        return report
+        return report_file
+    
+    def _save_session(self, delta: Optional[dict] = None):
+        """Save orchestration session state
+        
+        Without a delta the full snapshot is rewritten and the change log
+        reset; with one, a single change record is appended to the log.
+        """
+        
+        if delta is None:
+            fp = self._session_fp
+            fp.seek(0)
+            fp.truncate()
+            fp.write(_encode(self._snapshot(), indent=True))
+            fp.flush()
+            self._log_fp.truncate(0)
+            return
+        
+        record = {"ts": datetime.now().isoformat(), **delta}
+        self._log_fp.write(_encode(record) + b"\n")
+        self._log_fp.flush()
+    
+    def _snapshot(self) -> dict:
+        """Session state for session.json, without the per-task runtime caches"""
+        
+        state = {f.name: getattr(self.session, f.name) for f in fields(self.session)}
+        state["tasks"] = [
+            {name: getattr(task, name) for name in _PERSISTED_TASK_FIELDS}
+            for task in self.session.tasks
+        ]
+        return state
+    
+    def _checkpoint(self):
+        """Force session state to disk at phase boundaries"""
+        
+        for fp in (self._session_fp, self._log_fp):
+            fp.flush()
+            os.fsync(fp.fileno())
     
-    def _save_session(self):
-        """Save orchestration session state"""
+    def close(self):
+        """Close the session files"""
         
-        session_file = self.orchestration_dir / "session.json"
-        with open(session_file, 'w') as f:
-            json.dump(asdict(self.session), f, indent=2)
+        self._session_fp.close()
+        self._log_fp.close()
 
 # CLI interface
 if __name__ == "__main__":
@@ -334,4 +575,7 @@ if __name__ == "__main__":
     
     # Execute orchestration
     orchestrator.analyze_and_plan()
-    orchestrator.spawn_agents()
\ No newline at end of file
+    try:
+        asyncio.run(orchestrator.spawn_agents())
+    finally:
+        orchestrator.close()
\ No newline at end of file